@@ -0,0 +1,220 @@
+import argparse
+import hmac
+import json
+import os
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from configurations import Config as config
+from service import service, ServiceError
+from metrics import start_metrics_server
+
+def _int(value, name):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ServiceError(f"{name} must be an integer")
+
+def _optional_int(value, name):
+    return None if value is None else _int(value, name)
+
+# Route table: (method, path) -> handler(query, body)
+ROUTES = {
+    ("GET", "/health"): lambda q, b: {"status": "ok"},
+    ("POST", "/login"): lambda q, b: service.login(
+        b.get("email"), b.get("name"), b.get("google_id"), b.get("avatar_url")
+    ),
+    ("GET", "/users/search"): lambda q, b: service.search(
+        _int(q.get("user_id"), "user_id"), q.get("q", "")
+    ),
+    ("GET", "/friends"): lambda q, b: service.list_friends(
+        _int(q.get("user_id"), "user_id"),
+        _optional_int(q.get("limit"), "limit"),
+        _int(q.get("offset", 0), "offset")
+    ),
+    ("POST", "/friends"): lambda q, b: service.add_friend(
+        _int(b.get("user_id"), "user_id"), b.get("email")
+    ),
+    ("GET", "/friends/suggestions"): lambda q, b: service.suggest_friends(
+        _int(q.get("user_id"), "user_id"), _optional_int(q.get("limit"), "limit")
+    ),
+    ("POST", "/friends/import"): lambda q, b: service.import_contacts(
+        _int(b.get("user_id"), "user_id"), b.get("emails")
+    ),
+    ("GET", "/groups"): lambda q, b: service.list_groups(
+        _int(q.get("user_id"), "user_id"),
+        _optional_int(q.get("limit"), "limit"),
+        _int(q.get("offset", 0), "offset")
+    ),
+    ("POST", "/groups"): lambda q, b: service.create_group(
+        _int(b.get("user_id"), "user_id"), b.get("name"), b.get("member_ids", [])
+    ),
+    ("POST", "/groups/rename"): lambda q, b: service.rename_group(
+        _int(b.get("user_id"), "user_id"), _int(b.get("group_id"), "group_id"), b.get("name")
+    ),
+    ("POST", "/groups/delete"): lambda q, b: service.delete_group(
+        _int(b.get("user_id"), "user_id"), _int(b.get("group_id"), "group_id")
+    ),
+    ("GET", "/groups/members"): lambda q, b: service.list_group_members(
+        _int(q.get("user_id"), "user_id"), _int(q.get("group_id"), "group_id")
+    ),
+    ("POST", "/groups/members/add"): lambda q, b: service.add_group_members(
+        _int(b.get("user_id"), "user_id"), _int(b.get("group_id"), "group_id"), b.get("member_ids")
+    ),
+    ("POST", "/groups/members/remove"): lambda q, b: service.remove_group_members(
+        _int(b.get("user_id"), "user_id"), _int(b.get("group_id"), "group_id"), b.get("member_ids")
+    ),
+    ("POST", "/calls"): lambda q, b: service.start_call(
+        _int(b.get("user_id"), "user_id"), _int(b.get("friend_id"), "friend_id")
+    ),
+    ("POST", "/calls/join"): lambda q, b: service.join_call(
+        _int(b.get("user_id"), "user_id"), _int(b.get("friend_id"), "friend_id")
+    ),
+    ("POST", "/calls/group"): lambda q, b: service.start_group_call(
+        _int(b.get("user_id"), "user_id"), _int(b.get("group_id"), "group_id")
+    ),
+    ("GET", "/calls/invitations"): lambda q, b: service.list_invitations(
+        _int(q.get("user_id"), "user_id")
+    ),
+    ("POST", "/calls/invitations/accept"): lambda q, b: service.accept_invitation(
+        _int(b.get("user_id"), "user_id"), b.get("room_name")
+    ),
+    ("POST", "/calls/invitations/decline"): lambda q, b: service.decline_invitation(
+        _int(b.get("user_id"), "user_id"), b.get("room_name")
+    ),
+    ("GET", "/calls/recent"): lambda q, b: service.recent_calls(
+        _int(q.get("user_id"), "user_id"), _optional_int(q.get("limit"), "limit")
+    ),
+    ("GET", "/calls/stats"): lambda q, b: service.call_stats(
+        _int(q.get("user_id"), "user_id")
+    ),
+    ("POST", "/calls/end"): lambda q, b: service.end_call(
+        _int(b.get("user_id"), "user_id"), b.get("room_name")
+    ),
+}
+
+class APIHandler(BaseHTTPRequestHandler):
+    """JSON request handler over VoiceSnapService
+
+    The API is for trusted backends: whoever holds VOICESNAP_API_KEY vouches
+    for the user_id it sends and for the identities it logs in.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def _send(self, status, payload):
+        body = json.dumps(payload, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if self.close_connection:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self) -> bytes:
+        """Consume the whole request body up front so a keep-alive connection stays in sync"""
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            # The body's end is unknown, so nothing after it on this socket can be trusted
+            self.close_connection = True
+            raise ServiceError("Content-Length must be a non-negative integer")
+        return self.rfile.read(length) if length else b""
+
+    def _handle(self, method):
+        url = urlparse(self.path)
+        try:
+            raw_body = self._read_body()
+        except ServiceError as e:
+            self._send(e.status, {"error": e.message})
+            return
+
+        handler = ROUTES.get((method, url.path))
+        if not handler:
+            self._send(404, {"error": f"No route for {method} {url.path}"})
+            return
+
+        if config.API_KEY and not hmac.compare_digest(
+            self.headers.get("X-API-Key", "").encode("utf-8"), config.API_KEY.encode("utf-8")
+        ):
+            self._send(401, {"error": "Invalid API key"})
+            return
+
+        try:
+            body = json.loads(raw_body) if raw_body else {}
+            if not isinstance(body, dict):
+                raise ServiceError("Request body must be a JSON object")
+            query = {k: v[0] for k, v in parse_qs(url.query).items()}
+
+            self._send(200, handler(query, body))
+
+        except ServiceError as e:
+            self._send(e.status, {"error": e.message})
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            self._send(400, {"error": "Request body must be JSON"})
+        except Exception as e:
+            print(f"❌ API error on {method} {url.path}: {e}")
+            self._send(500, {"error": "Internal server error"})
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def log_message(self, format, *args):
+        if config.DEBUG:
+            super().log_message(format, *args)
+
+def serve(host: str, port: int, workers: int = 1, insecure: bool = False):
+    """Serve the API; with workers > 1 the bound socket is shared by forked processes"""
+
+    if not config.API_KEY and not insecure:
+        raise SystemExit(
+            "❌ VOICESNAP_API_KEY is not set - refusing to serve an unauthenticated API "
+            "(pass --insecure-no-auth for local development)"
+        )
+    if not config.API_KEY:
+        print("⚠️ Serving WITHOUT authentication - any client can act as any user")
+
+    server = ThreadingHTTPServer((host, port), APIHandler)
+    print(f"🎙️ VoiceSnap API listening on http://{host}:{port} ({workers} worker(s))")
+
+    children = []
+    index = 0
+    for i in range(1, workers):
+        pid = os.fork()
+        if pid == 0:
+            children = []
+            index = i
+            break
+        children.append(pid)
+
+    # Each worker keeps its own registry, so each exports it on its own port -
+    # one shared endpoint would answer from a random worker and look like counter
+    # resets. Like the app's endpoint it is unauthenticated and binds METRICS_HOST.
+    metrics_port = config.API_METRICS_PORT + index
+    if start_metrics_server(port=metrics_port):
+        print(f"📈 Worker {index} metrics on http://{config.METRICS_HOST}:{metrics_port}/metrics")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        for pid in children:
+            os.waitpid(pid, 0)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="VoiceSnap JSON API")
+    parser.add_argument("--host", default=config.API_HOST)
+    parser.add_argument("--port", type=int, default=config.API_PORT)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--insecure-no-auth", action="store_true",
+                        help="allow serving without VOICESNAP_API_KEY (local development only)")
+    args = parser.parse_args()
+
+    serve(args.host, args.port, args.workers, args.insecure_no_auth)
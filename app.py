@@ -1,12 +1,20 @@
 import streamlit as st
 import time
-from authlib.integrations.requests_client import OAuth2Session
 from database import db
 from daily_api import daily
+from avatar_cache import avatar_cache
+from service import VoiceSnapService, ServiceError
+from session_store import session_store
+import secrets
+import hmac
+import re
+from metrics import start_metrics_server, RERUN_SECONDS
 from configurations import Config as config
 import os
 import json
 import requests
+import profiler
+from profiler import Profiled
 
 # Page config
 st.set_page_config(
@@ -28,11 +36,36 @@ st.markdown("""
     .status-dot {width: 10px; height: 10px; border-radius: 50%; display: inline-block; margin-right: 8px;}
     .status-available {background: #22c55e;}
     .status-busy {background: #ef4444;}
+    .status-ringing {background: #f59e0b;}
     .status-offline {background: #9ca3af;}
     .call-header {background: #f8f9fa; border: 1px solid #e0e0e0; border-radius: 12px; padding: 20px; text-align: center; margin-bottom: 20px;}
 </style>
 """, unsafe_allow_html=True)
 
+# ============================================================================
+# PROFILING
+# ============================================================================
+
+# Opt-in with DEBUG, or ?profile=<PROFILE_TOKEN>: time each phase of the rerun
+# and every db / daily / avatar / session / service call made while rendering
+# it. Only DEBUG reruns dump cProfile stats, so a visitor can never make the
+# app write files.
+def profile_requested() -> bool:
+    requested = st.query_params.get("profile")
+    if not config.PROFILE_TOKEN or not requested:
+        return False
+    return hmac.compare_digest(requested.encode(), config.PROFILE_TOKEN.encode())
+
+profiler.start_rerun(
+    config.DEBUG or profile_requested(),
+    dump_dir=(config.PROFILE_DUMP_DIR or None) if config.DEBUG else None
+)
+db = Profiled(db, "db")
+daily = Profiled(daily, "daily")
+avatar_cache = Profiled(avatar_cache, "avatar")
+session_store = Profiled(session_store, "session")
+service = Profiled(VoiceSnapService(db, daily), "service")
+
 # ============================================================================
 # AUTHLIB CONFIGURATION
 # ============================================================================
@@ -53,6 +86,8 @@ def load_google_credentials():
 
 def get_authlib_oauth_session():
     """Create AuthLib OAuth2 session for Google"""
+    from authlib.integrations.requests_client import OAuth2Session
+    
     credentials = load_google_credentials()
     if not credentials:
         return None
@@ -76,6 +111,8 @@ def get_authlib_oauth_session():
         st.error(f"❌ Failed to create OAuth session: {e}")
         return None
 
+EMAIL_PATTERN = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+
 # Session state initialization
 if 'user' not in st.session_state:
     st.session_state.user = None
@@ -85,9 +122,83 @@ if 'current_room' not in st.session_state:
     st.session_state.current_room = None
 if 'room_url' not in st.session_state:
     st.session_state.room_url = None
+if 'call_token' not in st.session_state:
+    st.session_state.call_token = None
+if 'call_owner' not in st.session_state:
+    st.session_state.call_owner = False
 if 'auth_processed' not in st.session_state:
     st.session_state.auth_processed = False
 
+# ============================================================================
+# SHARED SESSION STORE
+# ============================================================================
+
+def restore_session():
+    """Rebuild session state from the shared store after a reconnect or replica move
+    
+    The session id travels in a cookie, never in the URL, so shared links,
+    browser history and Referer headers cannot carry it to someone else.
+    """
+    if 'session_id' in st.session_state:
+        return
+    
+    # Links from older versions carried ?sid= - it no longer restores anything
+    if "sid" in st.query_params:
+        del st.query_params["sid"]
+    
+    session_id = st.context.cookies.get(config.SESSION_COOKIE)
+    # Outside a browser session (bare mode, AppTest) there is no real cookie jar
+    if not isinstance(session_id, str):
+        session_id = None
+    record = session_store.load(session_id) if session_id else None
+    st.session_state.session_id = session_id if record else None
+    
+    if record and record['user_id']:
+        user = db.get_user(record['user_id'])
+        if user:
+            st.session_state.user = user
+            st.session_state.in_call = bool(record['in_call'])
+            st.session_state.current_room = record['current_room']
+            st.session_state.room_url = record['room_url']
+            st.session_state.call_owner = bool(record['call_owner'])
+
+def start_session():
+    """Issue a fresh session id on login so an id seen before login is worthless after it"""
+    if st.session_state.session_id:
+        session_store.delete(st.session_state.session_id)
+    st.session_state.session_id = None
+    save_session()
+
+def save_session():
+    """Persist auth and call state so any replica can pick up this session
+    
+    Meeting tokens stay in memory - a restored call asks Daily.co for a new one.
+    """
+    if not st.session_state.session_id:
+        st.session_state.session_id = secrets.token_urlsafe(24)
+    state = {
+        "user_id": st.session_state.user['id'] if st.session_state.user else None,
+        "in_call": st.session_state.in_call,
+        "current_room": st.session_state.current_room,
+        "room_url": st.session_state.room_url,
+        "call_owner": st.session_state.call_owner,
+    }
+    session_store.save(st.session_state.session_id, state)
+
+def sync_session_cookie():
+    """Point the browser's session cookie at this session, or expire it when logged out"""
+    session_id = st.session_state.session_id if st.session_state.user else None
+    max_age = config.SESSION_TTL_HOURS * 3600 if session_id else 0
+    st.html(f"""
+    <script>
+    document.cookie = "{config.SESSION_COOKIE}={session_id or ''}; path=/; max-age={max_age}; SameSite=Strict"
+        + (location.protocol === "https:" ? "; Secure" : "");
+    </script>
+    """, unsafe_allow_javascript=True)
+
+with profiler.phase("restore_session"):
+    restore_session()
+
 # ============================================================================
 # AUTHLIB OAUTH LOGIN
 # ============================================================================
@@ -193,7 +304,7 @@ def render_google_login():
                             name=user_info['name'],
                             google_id=user_info['id'],
                             avatar_url=user_info['picture']
-                        )
+                        ).result()
                         
                         if user:
                             st.session_state.user = user
@@ -201,6 +312,7 @@ def render_google_login():
                             # Clear query params BEFORE rerun
                             st.query_params.clear()
                             st.session_state.auth_processed = False
+                            start_session()
                             
                             st.success(f"✅ Welcome, {user_info['name']}!")
                             time.sleep(1)
@@ -278,8 +390,13 @@ def render_main_interface():
             st.session_state.user = None
             st.session_state.in_call = False
             st.session_state.auth_processed = False
+            if st.session_state.session_id:
+                session_store.delete(st.session_state.session_id)
+            st.session_state.session_id = None
             st.rerun()
     
+    render_invitations()
+    
     # GLOBAL SEARCH BAR
     st.markdown("### 🔍 Search Users Worldwide")
     search_query = st.text_input(
@@ -294,28 +411,104 @@ def render_main_interface():
         
         if results:
             st.markdown(f"**Found {len(results)} users:**")
+            avatar_cache.prefetch(user['avatar_url'] for user in results)
             for user in results:
                 render_search_result(user)
         else:
             st.info("No users found. Be the first to invite your friends!")
     
+    render_contact_import()
+    render_suggestions()
+    
     st.markdown("---")
     
     # Tabs for Friends and Groups
-    tab1, tab2 = st.tabs(["👥 Friends", "🎯 Groups"])
+    tab1, tab2, tab3 = st.tabs(["👥 Friends", "🎯 Groups", "🕘 Recent"])
     
     with tab1:
         render_friends_list()
     
     with tab2:
         render_groups_list()
+    
+    with tab3:
+        render_recent_calls()
+
+def render_invitations():
+    """Group calls this user has been invited to"""
+    invitations = service.list_invitations(st.session_state.user['id'])
+    
+    for invitation in invitations:
+        col1, col2, col3 = st.columns([4, 1, 1])
+        
+        with col1:
+            st.info(f"📞 {invitation['inviter_name']} is calling **{invitation['group_name'] or 'a group'}**")
+        
+        with col2:
+            if st.button("Join", key=f"invite_join_{invitation['id']}", type="primary", use_container_width=True):
+                accept_invitation(invitation)
+        
+        with col3:
+            if st.button("Decline", key=f"invite_decline_{invitation['id']}", use_container_width=True):
+                try:
+                    service.decline_invitation(st.session_state.user['id'], invitation['room_name'])
+                except ServiceError as e:
+                    st.error(f"❌ {e.message}")
+                st.rerun()
+
+def render_contact_import():
+    """Upload a contacts file and befriend everyone in it who is on VoiceSnap"""
+    with st.expander("📇 Import contacts"):
+        uploaded = st.file_uploader(
+            "Contacts file (CSV, vCard or plain text)",
+            type=["csv", "vcf", "txt"],
+            key="contacts_file"
+        )
+        
+        if uploaded and st.button("Find friends", key="import_contacts", type="primary"):
+            text = uploaded.getvalue().decode("utf-8", errors="ignore")
+            emails = EMAIL_PATTERN.findall(text)
+            
+            if not emails:
+                st.warning("No email addresses found in that file")
+                return
+            
+            try:
+                with st.spinner(f"Matching {len(emails)} contacts..."):
+                    result = service.import_contacts(st.session_state.user['id'], emails)
+            except ServiceError as e:
+                st.error(f"❌ {e.message}")
+                return
+            
+            st.success(
+                f"✅ {result['matched']} of {result['submitted']} contacts are on VoiceSnap "
+                f"• {result['added']} new friends • {result['unmatched']} not on VoiceSnap yet"
+            )
+
+def render_suggestions():
+    """People you may know, from the precomputed mutual-friend table"""
+    suggestions = db.get_friend_suggestions(st.session_state.user['id'])
+    
+    if not suggestions:
+        return
+    
+    st.markdown("### ✨ People You May Know")
+    avatar_cache.prefetch(user['avatar_url'] for user in suggestions)
+    for col, user in zip(st.columns(len(suggestions)), suggestions):
+        with col:
+            st.image(avatar_cache.get_avatar(user['avatar_url'], user['name']), width=60)
+            mutual = user['mutual_count']
+            st.markdown(f"**{user['name']}**  \n{mutual} mutual friend{'s' if mutual != 1 else ''}")
+            if st.button("➕ Add", key=f"suggest_{user['id']}", use_container_width=True):
+                if db.add_friend(st.session_state.user['id'], user['email']).result():
+                    st.rerun()
 
 def render_search_result(user):
     """Render search result with instant call button"""
     col1, col2, col3 = st.columns([1, 3, 2])
     
     with col1:
-        st.image(user['avatar_url'], width=60)
+        st.image(avatar_cache.get_avatar(user['avatar_url'], user['name']), width=60)
     
     with col2:
         status_class = f"status-{user.get('status', 'offline')}"
@@ -338,11 +531,13 @@ def render_search_result(user):
             elif user.get('status') == 'busy':
                 if st.button("👥 Join Call", key=f"join_{user['id']}", use_container_width=True):
                     join_user_call(user)
+            elif user.get('status') == 'ringing':
+                st.button("🔔 Ringing", key=f"ring_{user['id']}", disabled=True, use_container_width=True)
             else:
                 st.button("💤 Offline", key=f"off_{user['id']}", disabled=True, use_container_width=True)
         else:
             if st.button("➕ Add Friend", key=f"add_{user['id']}", use_container_width=True):
-                if db.add_friend(st.session_state.user['id'], user['email']):
+                if db.add_friend(st.session_state.user['id'], user['email']).result():
                     st.success(f"✅ Added {user['name']} as friend!")
                     time.sleep(1)
                     st.rerun()
@@ -351,19 +546,32 @@ def render_friends_list():
     """Friends list"""
     st.markdown("### Your Friends")
     
-    friends = db.get_user_friends(st.session_state.user['id'])
+    total = db.count_user_friends(st.session_state.user['id'])
     
-    if not friends:
+    if not total:
         st.info("👥 No friends yet. Use search above to find friends!")
         return
     
+    compact = st.checkbox(
+        "Compact list",
+        value=total > config.COMPACT_LIST_THRESHOLD,
+        key="friends_compact"
+    )
+    
+    if compact:
+        render_friends_page(total)
+        return
+    
+    friends = db.get_user_friends(st.session_state.user['id'])
+    avatar_cache.prefetch(f['friend']['avatar_url'] for f in friends)
+    
     for friend_data in friends:
         friend = friend_data['friend']
         
         col1, col2, col3 = st.columns([1, 3, 2])
         
         with col1:
-            st.image(friend['avatar_url'], width=60)
+            st.image(avatar_cache.get_avatar(friend['avatar_url'], friend['name']), width=60)
         
         with col2:
             status = friend.get('status', 'offline')
@@ -384,19 +592,109 @@ def render_friends_list():
             elif status == 'busy':
                 if st.button("👥 Join", key=f"fjoin_{friend['id']}", use_container_width=True):
                     join_user_call(friend)
+            elif status == 'ringing':
+                st.button("🔔 Ringing", key=f"fring_{friend['id']}", disabled=True, use_container_width=True)
             else:
                 st.button("💤 Offline", key=f"foff_{friend['id']}", disabled=True, use_container_width=True)
 
+def render_recent_calls():
+    """Recent calls from the event log plus rolled-up usage stats"""
+    user_id = st.session_state.user['id']
+    usage = db.get_call_usage(user_id)
+    
+    col1, col2 = st.columns(2)
+    col1.metric("Calls", usage['calls'])
+    col2.metric("Minutes talked", f"{usage['minutes']:.0f}")
+    
+    if usage['top_peers']:
+        st.markdown("**Most talked to:** " + " • ".join(
+            f"{peer['name']} ({peer['minutes']:.0f} min)" for peer in usage['top_peers']
+        ))
+    
+    st.markdown("### Recent Calls")
+    calls = db.get_recent_calls(user_id)
+    
+    if not calls:
+        st.info("🕘 No calls yet")
+        return
+    
+    for call in calls:
+        who = call['group_name'] or call['peer_name'] or "Unknown"
+        verb = "Called" if call['event'] == 'start' else "Joined"
+        when = time.strftime("%b %d, %H:%M", time.localtime(call['at']))
+        st.markdown(f"📞 {verb} **{who}** <span style='color: #666;'>{when}</span>", unsafe_allow_html=True)
+
+def render_pager(key, total):
+    """Page selector for compact lists - returns the row offset of the current page"""
+    pages = max(1, -(-total // config.LIST_PAGE_SIZE))
+    
+    if pages == 1:
+        return 0
+    
+    page = st.number_input(
+        f"Page (1-{pages})",
+        min_value=1,
+        max_value=pages,
+        value=1,
+        step=1,
+        key=f"{key}_page"
+    )
+    offset = (page - 1) * config.LIST_PAGE_SIZE
+    st.caption(f"Showing {offset + 1}-{min(offset + config.LIST_PAGE_SIZE, total)} of {total}")
+    return offset
+
+def render_friends_page(total):
+    """Compact friends list - one line per friend, only the current page is rendered"""
+    offset = render_pager("friends", total)
+    
+    friends = db.get_user_friends(
+        st.session_state.user['id'],
+        limit=config.LIST_PAGE_SIZE,
+        offset=offset,
+        online_first=True
+    )
+    
+    for friend_data in friends:
+        friend = friend_data['friend']
+        status = friend.get('status', 'offline')
+        
+        col1, col2 = st.columns([5, 1])
+        
+        with col1:
+            st.markdown(
+                f'<span class="status-dot status-{status}"></span><b>{friend["name"]}</b> '
+                f'<span style="color: #666; font-size: 14px;">{status.capitalize()}</span>',
+                unsafe_allow_html=True
+            )
+        
+        with col2:
+            if status == 'available':
+                if st.button("📞", key=f"ccall_{friend['id']}", use_container_width=True, type="primary"):
+                    start_call_with_user(friend)
+            elif status == 'busy':
+                if st.button("👥", key=f"cjoin_{friend['id']}", use_container_width=True):
+                    join_user_call(friend)
+
 def render_groups_list():
     """Groups list"""
     st.markdown("### Your Groups")
     
-    groups = db.get_user_groups(st.session_state.user['id'])
+    render_create_group()
     
-    if not groups:
+    total = db.count_user_groups(st.session_state.user['id'])
+    
+    if not total:
         st.info("🎯 No groups yet")
         return
     
+    offset = 0
+    limit = None
+    if total > config.COMPACT_LIST_THRESHOLD:
+        offset = render_pager("groups", total)
+        limit = config.LIST_PAGE_SIZE
+    
+    groups = db.get_user_groups(st.session_state.user['id'], limit=limit, offset=offset)
+    
     for group in groups:
         col1, col2, col3 = st.columns([1, 3, 2])
         
@@ -419,43 +717,148 @@ def render_groups_list():
         with col3:
             if st.button("📞 Start Group Call", key=f"group_{group['id']}", use_container_width=True):
                 start_group_call(group)
+    
+    render_manage_group(groups)
+
+def friend_picker(label, key, exclude_ids=()):
+    """Search-driven multiselect over the user's friends - returns the chosen user ids
+    
+    Friends are only loaded for a typed query, so the friend list is not
+    pulled on every rerun (Streamlit runs closed expanders and tabs too).
+    """
+    picked_key = f"{key}_picked"
+    picked = st.session_state.get(picked_key, {})
+    
+    query = st.text_input(f"{label}: search friends", key=f"{key}_query", placeholder="Type a name or email...")
+    names = dict(picked)
+    if len(query.strip()) >= 2:
+        for friend in db.search_user_friends(st.session_state.user['id'], query.strip()):
+            if friend['id'] not in exclude_ids:
+                names[friend['id']] = f"{friend['name']} ({friend['email']})"
+    
+    # Keep earlier picks selectable after the query changes
+    selected = st.multiselect(label, options=list(names), format_func=names.get, key=key)
+    st.session_state[picked_key] = {user_id: names[user_id] for user_id in selected}
+    return selected
+
+def render_create_group():
+    """New group form"""
+    with st.expander("➕ New group"):
+        name = st.text_input("Group name", key="new_group_name")
+        member_ids = friend_picker("Members", key="new_group_members")
+        
+        if st.button("Create group", key="create_group", type="primary"):
+            try:
+                group = service.create_group(st.session_state.user['id'], name, member_ids)
+            except ServiceError as e:
+                st.error(f"❌ {e.message}")
+                return
+            st.success(f"✅ Created {group['name']} with {group['member_count']} members")
+            time.sleep(1)
+            st.rerun()
+
+def render_manage_group(groups):
+    """Rename, delete and bulk add/remove members for one of the user's own groups"""
+    user_id = st.session_state.user['id']
+    own_groups = {g['id']: g for g in groups if g['created_by'] == user_id}
+    
+    if not own_groups:
+        return
+    
+    with st.expander("⚙️ Manage a group"):
+        group_id = st.selectbox(
+            "Group",
+            options=list(own_groups),
+            format_func=lambda gid: own_groups[gid]['name'],
+            key="manage_group"
+        )
+        group = own_groups[group_id]
+        members = service.list_group_members(user_id, group_id)
+        member_names = {m['id']: m['name'] for m in members if m['id'] != user_id}
+        
+        st.caption(f"{group['member_count']} / {config.MAX_ROOM_SIZE} members")
+        
+        to_add = friend_picker("Add friends", key=f"add_members_{group_id}", exclude_ids=member_names.keys() | {user_id})
+        to_remove = st.multiselect(
+            "Remove members",
+            options=list(member_names),
+            format_func=member_names.get,
+            key=f"remove_members_{group_id}"
+        )
+        new_name = st.text_input("Rename", value=group['name'], key=f"rename_group_{group_id}")
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            if st.button("💾 Save changes", key=f"save_group_{group_id}", use_container_width=True, type="primary"):
+                try:
+                    if to_add:
+                        service.add_group_members(user_id, group_id, to_add)
+                    if to_remove:
+                        service.remove_group_members(user_id, group_id, to_remove)
+                    if new_name.strip() != group['name']:
+                        service.rename_group(user_id, group_id, new_name)
+                except ServiceError as e:
+                    st.error(f"❌ {e.message}")
+                    return
+                st.rerun()
+        
+        with col2:
+            if st.button("🗑️ Delete group", key=f"delete_group_{group_id}", use_container_width=True):
+                service.delete_group(user_id, group_id)
+                st.rerun()
 
 # ============================================================================
 # CALL FUNCTIONS
 # ============================================================================
 
+def enter_call(call, owner=False):
+    """Move this session into a call returned by the service"""
+    st.session_state.current_room = call['room_name']
+    st.session_state.room_url = call['room_url']
+    st.session_state.call_token = call.get('token')
+    st.session_state.call_owner = owner
+    st.session_state.in_call = True
+    save_session()
+    st.rerun()
+
 def start_call_with_user(user):
     """Start 1:1 call with a user"""
     with st.spinner(f"Calling {user['name']}..."):
-        room = daily.create_room(max_participants=2)
-        
-        if room:
-            st.session_state.current_room = room['name']
-            st.session_state.room_url = room['url']
-            st.session_state.in_call = True
-            db.update_user_status(st.session_state.user['id'], 'busy', room['name'])
-            st.rerun()
+        try:
+            call = service.start_call(st.session_state.user['id'], user['id'])
+        except ServiceError as e:
+            st.error(f"❌ {e.message}")
+            return
+        enter_call(call, owner=True)
 
 def join_user_call(user):
     """Join user's active call"""
-    if user.get('room_id'):
-        st.session_state.current_room = user['room_id']
-        st.session_state.room_url = f"https://{user['room_id']}.daily.co/{user['room_id']}"
-        st.session_state.in_call = True
-        db.update_user_status(st.session_state.user['id'], 'busy', user['room_id'])
-        st.rerun()
+    try:
+        call = service.join_call(st.session_state.user['id'], user['id'])
+    except ServiceError as e:
+        st.error(f"❌ {e.message}")
+        return
+    enter_call(call)
 
 def start_group_call(group):
     """Start group call"""
     with st.spinner(f"Starting {group['name']}..."):
-        room = daily.create_room(max_participants=100)
-        
-        if room:
-            st.session_state.current_room = room['name']
-            st.session_state.room_url = room['url']
-            st.session_state.in_call = True
-            db.update_user_status(st.session_state.user['id'], 'busy', room['name'])
-            st.rerun()
+        try:
+            call = service.start_group_call(st.session_state.user['id'], group['id'])
+        except ServiceError as e:
+            st.error(f"❌ {e.message}")
+            return
+        enter_call(call, owner=True)
+
+def accept_invitation(invitation):
+    """Join a group call this user was invited to"""
+    try:
+        call = service.accept_invitation(st.session_state.user['id'], invitation['room_name'])
+    except ServiceError as e:
+        st.error(f"❌ {e.message}")
+        return
+    enter_call(call)
 
 # ============================================================================
 # CALL INTERFACE
@@ -480,14 +883,17 @@ def render_call_interface():
             end_call()
     
     if st.session_state.room_url:
-        try:
-            token = daily.create_meeting_token(
-                st.session_state.current_room,
-                st.session_state.user['name'],
-                is_owner=True
-            )
-        except:
-            token = None
+        token = st.session_state.call_token
+        if not token:
+            try:
+                token = daily.create_meeting_token(
+                    st.session_state.current_room,
+                    st.session_state.user['name'],
+                    is_owner=st.session_state.call_owner
+                )
+            except:
+                token = None
+            st.session_state.call_token = token
         
         if token:
             url = f"{st.session_state.room_url}?t={token}&videoOff=true&showLocalVideo=false"
@@ -507,15 +913,16 @@ def render_call_interface():
 def end_call():
     """End call and return home"""
     try:
-        daily.delete_room(st.session_state.current_room)
-    except:
-        pass
-    
-    db.update_user_status(st.session_state.user['id'], 'available', None)
+        service.end_call(st.session_state.user['id'], st.session_state.current_room)
+    except Exception:
+        db.update_user_status(st.session_state.user['id'], 'available', None).result()
     
     st.session_state.in_call = False
     st.session_state.current_room = None
     st.session_state.room_url = None
+    st.session_state.call_token = None
+    st.session_state.call_owner = False
+    save_session()
     
     st.success("Call ended. Returning home...")
     time.sleep(1)
@@ -525,17 +932,43 @@ def end_call():
 # MAIN APP
 # ============================================================================
 
+def render_profile(profile):
+    """Timing breakdown of the rerun that just finished"""
+    report = profile.report()
+    
+    with st.expander(f"⏱️ Rerun profile: {report['total_ms']:.1f} ms", expanded=True):
+        st.caption("Self time by category (app = Streamlit rendering and app code): " + ", ".join(
+            f"{category} {ms:.1f} ms" for category, ms in report['categories'].items()
+        ))
+        st.table(report['phases'])
+        if report['calls']:
+            st.table(report['calls'])
+        if report['dump_path']:
+            st.caption(f"cProfile stats written to {report['dump_path']}")
+
 def main():
-    if not config.DAILY_API_KEY:
-        st.error("⚠️ Daily.co API key not configured!")
-        st.stop()
-    
-    if not st.session_state.user:
-        render_google_login()
-    elif st.session_state.in_call:
-        render_call_interface()
-    else:
-        render_main_interface()
+    try:
+        if not config.DAILY_API_KEY:
+            st.error("⚠️ Daily.co API key not configured!")
+            st.stop()
+        
+        start_metrics_server()
+        sync_session_cookie()
+        
+        if not st.session_state.user:
+            with RERUN_SECONDS.time(page="login"), profiler.phase("login"):
+                render_google_login()
+        elif st.session_state.in_call:
+            with RERUN_SECONDS.time(page="call"), profiler.phase("call"):
+                render_call_interface()
+        else:
+            with RERUN_SECONDS.time(page="main"), profiler.phase("main"):
+                render_main_interface()
+    finally:
+        profile = profiler.finish_rerun()
+    
+    if profile:
+        render_profile(profile)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,226 @@
+import hashlib
+import io
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Optional, Dict, Iterable
+
+import requests
+
+from configurations import Config as config
+from lazy import LazyInstance
+
+class AvatarCache:
+    """Local on-disk cache of avatar thumbnails
+
+    Thumbnails are keyed by a hash of the URL, not of the image bytes: the
+    page only knows the URL until the download finishes, and Google avatar
+    URLs already change when the picture does.
+
+    Rendering never waits on the network. prefetch() downloads the rows a
+    page is about to show concurrently, within a total time budget;
+    get_avatar() serves whatever is on disk and a placeholder for the rest,
+    which shows up on a later rerun once its download lands.
+    """
+
+    PLACEHOLDER_COLORS = ["#f5576c", "#4285F4", "#22c55e", "#f59e0b", "#8b5cf6", "#06b6d4"]
+
+    def __init__(self, cache_dir: str = None, size: int = None, max_bytes: int = None):
+        self.cache_dir = cache_dir or config.AVATAR_CACHE_DIR
+        self.size = size or config.AVATAR_SIZE
+        self.max_bytes = max_bytes or config.AVATAR_CACHE_MAX_MB * 1024 * 1024
+        self.timeout = config.AVATAR_FETCH_TIMEOUT
+        self.retry_after = config.AVATAR_RETRY_SECONDS
+        self.prefetch_budget = config.AVATAR_PREFETCH_BUDGET
+        self.max_failed = config.AVATAR_FAILED_MAX
+        self._failed: Dict[str, float] = {}
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=config.AVATAR_FETCH_WORKERS,
+                                        thread_name_prefix="avatar-fetch")
+        self._placeholders: Dict[str, bytes] = {}
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path(self, url: str) -> str:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.png")
+
+    def get_avatar(self, url: Optional[str], name: str = "") -> bytes:
+        """Return cached thumbnail PNG bytes for an avatar URL, or an initials placeholder
+
+        A miss starts a background download instead of blocking the rerun.
+        """
+
+        if not url:
+            return self.placeholder(name)
+
+        path = self._path(url)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            # Touch so eviction drops the least recently used thumbnails first
+            os.utime(path, None)
+            return data
+        except OSError:
+            pass
+
+        self._schedule(url, path)
+        return self.placeholder(name)
+
+    def prefetch(self, urls: Iterable[Optional[str]], budget: float = None):
+        """Download the missing thumbnails for urls concurrently
+
+        Waits at most budget seconds in total (AVATAR_PREFETCH_BUDGET by
+        default); downloads still running keep going in the background.
+        """
+
+        futures = []
+        for url in dict.fromkeys(urls):
+            if not url:
+                continue
+            path = self._path(url)
+            if os.path.exists(path):
+                continue
+            future = self._schedule(url, path)
+            if future:
+                futures.append(future)
+
+        if futures:
+            wait(futures, timeout=self.prefetch_budget if budget is None else budget)
+
+    def _schedule(self, url: str, path: str) -> Optional[Future]:
+        """Start downloading url unless it is already in flight or failed recently"""
+
+        with self._lock:
+            future = self._inflight.get(url)
+            if future:
+                return future
+
+            # Don't retry a failing CDN on every rerun
+            failed_at = self._failed.get(url)
+            if failed_at and time.time() - failed_at < self.retry_after:
+                return None
+
+            future = self._pool.submit(self._download, url, path)
+            self._inflight[url] = future
+            return future
+
+    def _download(self, url: str, path: str):
+        try:
+            data = self._fetch_thumbnail(url)
+            if data is None:
+                self._record_failure(url)
+                return
+            with self._lock:
+                self._failed.pop(url, None)
+            self._store(path, data)
+        finally:
+            with self._lock:
+                self._inflight.pop(url, None)
+
+    def _record_failure(self, url: str):
+        with self._lock:
+            now = time.time()
+            self._failed.pop(url, None)
+            self._failed[url] = now
+            if len(self._failed) <= self.max_failed:
+                return
+
+            # Forget failures whose back-off is over, then the oldest ones
+            for failed_url, failed_at in list(self._failed.items()):
+                if now - failed_at < self.retry_after:
+                    break
+                del self._failed[failed_url]
+            while len(self._failed) > self.max_failed:
+                del self._failed[next(iter(self._failed))]
+
+    def _fetch_thumbnail(self, url: str) -> Optional[bytes]:
+        from PIL import Image
+
+        try:
+            response = requests.get(url, timeout=self.timeout)
+            response.raise_for_status()
+            image = Image.open(io.BytesIO(response.content))
+            image = image.convert("RGBA")
+            image.thumbnail((self.size, self.size))
+
+            buffer = io.BytesIO()
+            image.save(buffer, format="PNG", optimize=True)
+            return buffer.getvalue()
+
+        except Exception as e:
+            if config.DEBUG:
+                print(f"❌ Error fetching avatar {url}: {e}")
+            return None
+
+    def _store(self, path: str, data: bytes):
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            if config.DEBUG:
+                print(f"⚠️ Could not cache avatar: {e}")
+            return
+
+        self.evict()
+
+    def evict(self):
+        """Remove least recently used thumbnails until the cache fits in max_bytes"""
+
+        entries = []
+        total = 0
+        for entry in os.scandir(self.cache_dir):
+            if not entry.name.endswith(".png"):
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total += stat.st_size
+
+        if total <= self.max_bytes:
+            return
+
+        entries.sort()
+        for _, size, path in entries:
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def placeholder(self, name: str) -> bytes:
+        """Generate (and memoize) an initials placeholder thumbnail"""
+
+        initials = "".join(part[0] for part in (name or "?").split()[:2]).upper() or "?"
+        if initials in self._placeholders:
+            return self._placeholders[initials]
+
+        from PIL import Image, ImageDraw, ImageFont
+
+        color = self.PLACEHOLDER_COLORS[sum(map(ord, initials)) % len(self.PLACEHOLDER_COLORS)]
+        image = Image.new("RGB", (self.size, self.size), color)
+        draw = ImageDraw.Draw(image)
+        font = ImageFont.load_default()
+        left, top, right, bottom = draw.textbbox((0, 0), initials, font=font)
+        draw.text(
+            ((self.size - (right - left)) / 2 - left, (self.size - (bottom - top)) / 2 - top),
+            initials,
+            fill="white",
+            font=font
+        )
+
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG")
+        data = buffer.getvalue()
+        self._placeholders[initials] = data
+        return data
+
+# Create global instance
+avatar_cache = LazyInstance(AvatarCache)
@@ -0,0 +1,149 @@
+import argparse
+import gzip
+import os
+import shutil
+import sqlite3
+import time
+from configurations import Config as config
+
+# Outside WAL mode a page-stepped copy restarts whenever another connection
+# writes to the source; after this many restarts the rest is copied in one step
+MAX_RESTARTS = 3
+
+class _Restarted(Exception):
+    pass
+
+def _copy(source: sqlite3.Connection, dest: sqlite3.Connection, pages: int, pause: float) -> int:
+    """Run the backup API, sleeping between steps; returns the number of restarts"""
+    restarts = 0
+    last_remaining = None
+
+    def progress(status, remaining, total):
+        nonlocal restarts, last_remaining
+        if last_remaining is not None and remaining > last_remaining:
+            restarts += 1
+            if restarts > MAX_RESTARTS:
+                raise _Restarted()
+        last_remaining = remaining
+        if remaining:
+            time.sleep(pause)
+
+    # In WAL mode an open read transaction pins one snapshot for every step,
+    # so writes from the app neither block the copy nor restart it
+    source.execute("BEGIN")
+    source.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+    try:
+        source.backup(dest, pages=pages, progress=progress)
+    except _Restarted:
+        print(f"⚠️ Source kept changing ({restarts} restarts) - copying the rest in one step")
+        source.backup(dest, pages=-1)
+    finally:
+        source.rollback()
+    return restarts
+
+def _compress(path: str) -> str:
+    compressed = f"{path}.gz"
+    with open(path, "rb") as src, gzip.open(compressed, "wb", compresslevel=6) as dst:
+        shutil.copyfileobj(src, dst, 1024 * 1024)
+    os.remove(path)
+    return compressed
+
+def prune_snapshots(backup_dir: str, prefix: str, keep: int) -> list:
+    """Delete all but the newest keep snapshots named prefix-<timestamp>.db[.gz]"""
+    snapshots = sorted(
+        name for name in os.listdir(backup_dir)
+        if name.startswith(f"{prefix}-") and name.endswith((".db", ".db.gz"))
+    )
+    removed = snapshots[:-keep] if keep > 0 else snapshots
+    for name in removed:
+        os.remove(os.path.join(backup_dir, name))
+    return removed
+
+def backup_database(db_path: str = None, backup_dir: str = None, compress: bool = None, keep: int = None,
+                    pages: int = None, pause: float = None) -> dict:
+    """Snapshot a live database with SQLite's online backup API
+
+    Pages are copied in steps of `pages` with `pause` seconds between
+    steps, so the copy never holds the database for long and its I/O is
+    spread out. The snapshot is written under a temporary name and only
+    renamed into place after an integrity check.
+    """
+
+    db_path = db_path or config.DATABASE_PATH
+    backup_dir = backup_dir or config.BACKUP_DIR
+    compress = config.BACKUP_COMPRESS if compress is None else compress
+    keep = config.BACKUP_KEEP if keep is None else keep
+    pages = pages or config.BACKUP_PAGES_PER_STEP
+    pause = config.BACKUP_STEP_PAUSE_SECONDS if pause is None else pause
+
+    os.makedirs(backup_dir, exist_ok=True)
+    prefix = os.path.splitext(os.path.basename(db_path))[0]
+    path = os.path.join(backup_dir, f"{prefix}-{time.strftime('%Y%m%d-%H%M%S')}.db")
+    partial = f"{path}.partial"
+
+    started = time.perf_counter()
+    source = sqlite3.connect(db_path)
+    dest = sqlite3.connect(partial)
+    try:
+        restarts = _copy(source, dest, pages, pause)
+        size = dest.execute("PRAGMA page_count").fetchone()[0] * dest.execute("PRAGMA page_size").fetchone()[0]
+        check = dest.execute("PRAGMA quick_check").fetchone()[0]
+        if check != "ok":
+            raise RuntimeError(f"Backup of {db_path} failed quick_check: {check}")
+    except Exception:
+        dest.close()
+        os.remove(partial)
+        raise
+    finally:
+        dest.close()
+        source.close()
+    copy_seconds = time.perf_counter() - started
+
+    os.replace(partial, path)
+    if compress:
+        path = _compress(path)
+    seconds = time.perf_counter() - started
+
+    report = {
+        "path": path,
+        "bytes": size,
+        "stored_bytes": os.path.getsize(path),
+        "copy_seconds": round(copy_seconds, 3),
+        "seconds": round(seconds, 3),
+        "mb_per_second": round(size / 1024 / 1024 / copy_seconds, 2) if copy_seconds else None,
+        "restarts": restarts,
+        "pruned": prune_snapshots(backup_dir, prefix, keep),
+    }
+
+    print(
+        f"✅ Backed up {db_path} to {path}: {size / 1024 / 1024:.1f} MB in {copy_seconds:.2f}s "
+        f"({report['mb_per_second']} MB/s), stored {report['stored_bytes'] / 1024 / 1024:.1f} MB"
+        + (f", {restarts} restart(s)" if restarts else "")
+    )
+    for name in report["pruned"]:
+        print(f"🗑️ Removed old snapshot {name}")
+    return report
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Online, page-stepped backup of the VoiceSnap database")
+    parser.add_argument("--db", default=config.DATABASE_PATH)
+    parser.add_argument("--dir", default=config.BACKUP_DIR, help="snapshot directory")
+    parser.add_argument("--keep", type=int, default=config.BACKUP_KEEP, help="snapshots to retain")
+    parser.add_argument("--compress", action=argparse.BooleanOptionalAction, default=config.BACKUP_COMPRESS)
+    parser.add_argument("--pages", type=int, default=config.BACKUP_PAGES_PER_STEP, help="pages copied per step")
+    parser.add_argument("--pause", type=float, default=config.BACKUP_STEP_PAUSE_SECONDS,
+                        help="seconds to sleep between steps")
+    parser.add_argument("--every", type=int, nargs="?", const=config.BACKUP_INTERVAL_SECONDS,
+                        help="keep running, taking a snapshot every N seconds (default BACKUP_INTERVAL_SECONDS)")
+    args = parser.parse_args()
+
+    def run():
+        return backup_database(args.db, args.dir, args.compress, args.keep, args.pages, args.pause)
+
+    run()
+    while args.every:
+        time.sleep(args.every)
+        try:
+            run()
+        except Exception as e:
+            print(f"❌ Backup failed, retrying next run: {e}")
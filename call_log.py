@@ -0,0 +1,67 @@
+import atexit
+import threading
+import time
+from typing import Optional
+from configurations import Config as config
+from database import db as default_db
+from lazy import LazyInstance
+
+class CallLog:
+    """Append-only call event log with batched writes
+
+    record() only queues the event with its timestamp; a background thread
+    appends everything queued in one transaction every CALL_LOG_FLUSH_SECONDS,
+    or sooner once CALL_LOG_BATCH_SIZE events are waiting. Call paths never
+    wait on the log write.
+    """
+
+    EVENTS = ("start", "join", "end")
+
+    def __init__(self, database=None, batch_size: int = None, flush_seconds: float = None):
+        self.db = database or default_db
+        self.batch_size = batch_size or config.CALL_LOG_BATCH_SIZE
+        self.flush_seconds = flush_seconds or config.CALL_LOG_FLUSH_SECONDS
+        self._pending = []
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        atexit.register(self.flush)
+
+    def record(self, event: str, user_id: int, room_name: str, peer_id: Optional[int] = None,
+               group_id: Optional[int] = None):
+        if event not in self.EVENTS:
+            raise ValueError(f"Unknown call event {event!r}")
+
+        with self._cond:
+            self._pending.append((event, user_id, room_name, peer_id, group_id, time.time()))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="call-log", daemon=True)
+                self._thread.start()
+            if len(self._pending) >= self.batch_size:
+                self._cond.notify()
+
+    def flush(self) -> int:
+        """Write everything queued so far; returns the number of events written"""
+        with self._flush_lock:
+            with self._cond:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return 0
+            try:
+                return self.db.append_call_events(batch).result()
+            except Exception as e:
+                # Put the batch back in order so the next flush retries it
+                with self._cond:
+                    self._pending[:0] = batch
+                print(f"❌ Error writing {len(batch)} call events: {e}")
+                return 0
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if len(self._pending) < self.batch_size:
+                    self._cond.wait(self.flush_seconds)
+            self.flush()
+
+# Create global instance
+call_log = LazyInstance(CallLog)
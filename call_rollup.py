@@ -0,0 +1,41 @@
+import argparse
+import time
+from configurations import Config as config
+from database import Database
+
+def roll_up(database: Database) -> dict:
+    started = time.perf_counter()
+    result = database.roll_up_calls().result()
+    print(
+        f"✅ Rolled up {result['events']:,} call events: {result['users']:,} users, "
+        f"{result['days']:,} days, {result['pairs']:,} pairs ({time.perf_counter() - started:.2f}s)"
+    )
+    return result
+
+def expire_invitations(database: Database) -> dict:
+    result = database.expire_invitations().result()
+    if result['invitations']:
+        print(f"⌛ Expired {result['invitations']:,} unanswered invitations, stopped ringing {result['users']:,} users")
+    return result
+
+def run(database: Database):
+    roll_up(database)
+    expire_invitations(database)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Fold new call events into the usage summary tables and expire unanswered invitations"
+    )
+    parser.add_argument("--db", default=config.DATABASE_PATH)
+    parser.add_argument("--every", type=int, nargs="?", const=config.CALL_ROLLUP_SECONDS,
+                        help="keep running, rolling up every N seconds (default CALL_ROLLUP_SECONDS)")
+    args = parser.parse_args()
+
+    database = Database(args.db)
+    run(database)
+    while args.every:
+        time.sleep(args.every)
+        try:
+            run(database)
+        except Exception as e:
+            print(f"❌ Rollup failed, retrying next run: {e}")
@@ -1,6 +1,6 @@
 import os
 from dotenv import load_dotenv
-import streamlit as st
+from lazy import memoized_setting
 
 load_dotenv()
 
@@ -8,14 +8,22 @@ class Config:
     """Production configuration for VoiceSnap"""
     
     # Daily.co API Configuration
-    DAILY_API_KEY = os.getenv("DAILY_API_KEY", "")
-    if not DAILY_API_KEY:
-        try:
-            DAILY_API_KEY = st.secrets["DAILY_API_KEY"]
-        except:
-            pass
+    @staticmethod
+    def get_daily_api_key():
+        """Read the Daily.co API key from .env, falling back to Streamlit secrets"""
+        api_key = os.getenv("DAILY_API_KEY", "")
+        if not api_key:
+            try:
+                import streamlit as st
+                api_key = st.secrets["DAILY_API_KEY"]
+            except:
+                pass
+        return api_key
+    
+    DAILY_API_KEY = memoized_setting(get_daily_api_key)
     
-    DAILY_API_URL = "https://api.daily.co/v1"
+    DAILY_API_URL = os.getenv("DAILY_API_URL", "https://api.daily.co/v1")
+    DAILY_POOL_SIZE = int(os.getenv("DAILY_POOL_SIZE", "32"))
     
     # Google OAuth Configuration - AUTO-DETECT REDIRECT URI
     @staticmethod
@@ -27,6 +35,8 @@ class Config:
         if env_uri:
             return env_uri
         
+        import streamlit as st
+        
         # Try from Streamlit secrets
         try:
             return st.secrets.get("GOOGLE_REDIRECT_URI")
@@ -46,14 +56,100 @@ class Config:
         
         return "http://localhost:8501/"
     
-    GOOGLE_REDIRECT_URI = get_google_redirect_uri()
+    # Resolved on first use, not at import - touching st.secrets is slow on cold start
+    GOOGLE_REDIRECT_URI = memoized_setting(get_google_redirect_uri)
     
     # App Configuration
     MAX_ROOM_SIZE = 100
     ROOM_EXPIRY_MINUTES = 60
+    LIST_PAGE_SIZE = 25
+    MAX_CONTACT_IMPORT = 10000
+    # Matches the group member picker shows per search
+    FRIEND_PICKER_LIMIT = 50
+    COMPACT_LIST_THRESHOLD = 50
+    SUGGESTION_LIMIT = 5
+    # Users with more friends than this don't count as a mutual friend in suggestions
+    SUGGESTION_MAX_FANOUT = 100
+    # Candidates stored per user in friend_suggestions; the rest are pruned
+    SUGGESTION_KEEP = 20
+    # Users per transaction in rebuild_suggestions.py
+    SUGGESTION_REBUILD_CHUNK = int(os.getenv("SUGGESTION_REBUILD_CHUNK", "500"))
+    SUGGESTION_REBUILD_SECONDS = int(os.getenv("SUGGESTION_REBUILD_SECONDS", "86400"))
     
     # Database Configuration
-    DATABASE_PATH = "voicesnap.db"
+    DATABASE_PATH = os.getenv("DATABASE_PATH", "voicesnap.db")
+    # Most queued writes the writer thread group-commits in one transaction
+    DB_WRITE_BATCH_MAX = int(os.getenv("DB_WRITE_BATCH_MAX", "256"))
+    
+    # Online backups (backup.py)
+    BACKUP_DIR = os.getenv("BACKUP_DIR", "backups")
+    BACKUP_KEEP = int(os.getenv("BACKUP_KEEP", "7"))
+    BACKUP_COMPRESS = os.getenv("BACKUP_COMPRESS", "True").lower() == "true"
+    BACKUP_INTERVAL_SECONDS = int(os.getenv("BACKUP_INTERVAL_SECONDS", "86400"))
+    BACKUP_PAGES_PER_STEP = int(os.getenv("BACKUP_PAGES_PER_STEP", "1024"))
+    BACKUP_STEP_PAUSE_SECONDS = float(os.getenv("BACKUP_STEP_PAUSE_SECONDS", "0.02"))
+    
+    # Avatar Cache Configuration
+    AVATAR_CACHE_DIR = os.getenv("AVATAR_CACHE_DIR", ".avatar_cache")
+    AVATAR_CACHE_MAX_MB = int(os.getenv("AVATAR_CACHE_MAX_MB", "50"))
+    AVATAR_SIZE = 60
+    AVATAR_FETCH_TIMEOUT = 3
+    AVATAR_RETRY_SECONDS = 300
+    # Total time a rerun waits for the avatars it is about to show
+    AVATAR_PREFETCH_BUDGET = float(os.getenv("AVATAR_PREFETCH_BUDGET", "0.5"))
+    AVATAR_FETCH_WORKERS = int(os.getenv("AVATAR_FETCH_WORKERS", "8"))
+    # Failing URLs remembered for AVATAR_RETRY_SECONDS back-off
+    AVATAR_FAILED_MAX = int(os.getenv("AVATAR_FAILED_MAX", "1000"))
+    
+    # Call history (call_log.py batches appends, call_rollup.py summarizes)
+    CALL_LOG_BATCH_SIZE = int(os.getenv("CALL_LOG_BATCH_SIZE", "500"))
+    CALL_LOG_FLUSH_SECONDS = float(os.getenv("CALL_LOG_FLUSH_SECONDS", "2"))
+    CALL_ROLLUP_SECONDS = int(os.getenv("CALL_ROLLUP_SECONDS", "300"))
+    RECENT_CALLS_LIMIT = 10
+    
+    # Session Store Configuration
+    SESSION_BACKEND = os.getenv("SESSION_BACKEND", "sqlite")
+    SESSION_TTL_HOURS = int(os.getenv("SESSION_TTL_HOURS", "24"))
+    SESSION_PURGE_SECONDS = int(os.getenv("SESSION_PURGE_SECONDS", "600"))
+    # The session id lives in this cookie, never in the URL
+    SESSION_COOKIE = os.getenv("SESSION_COOKIE", "voicesnap_sid")
+    
+    # Prometheus metrics endpoint
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "True").lower() == "true"
+    METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+    METRICS_PORT = int(os.getenv("METRICS_PORT", "9464"))
+    
+    # JSON API Configuration
+    API_HOST = os.getenv("API_HOST", "127.0.0.1")
+    API_PORT = int(os.getenv("API_PORT", "8600"))
+    API_KEY = os.getenv("VOICESNAP_API_KEY", "")
+    # API worker i exports its metrics on API_METRICS_PORT + i
+    API_METRICS_PORT = int(os.getenv("API_METRICS_PORT", "9465"))
+    
+    # Performance smoke-test thresholds (deployment_verification.py --perf)
+    PERF_SAMPLES = int(os.getenv("PERF_SAMPLES", "50"))
+    PERF_DAILY_SAMPLES = int(os.getenv("PERF_DAILY_SAMPLES", "5"))
+    PERF_SEARCH_DATASET_SIZE = int(os.getenv("PERF_SEARCH_DATASET_SIZE", "100000"))
+    PERF_P95_DB_MS = float(os.getenv("PERF_P95_DB_MS", "5"))
+    PERF_P95_SEARCH_MS = float(os.getenv("PERF_P95_SEARCH_MS", "100"))
+    PERF_P95_DAILY_MS = float(os.getenv("PERF_P95_DAILY_MS", "1500"))
+    PERF_REPORT_PATH = os.getenv("PERF_REPORT_PATH", "perf_report.json")
+    
+    # Statements slower than this are logged (parameters redacted)
+    SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "100"))
+    
+    # Database benchmark suite (db_benchmark.py)
+    BENCH_BASELINE_PATH = os.getenv("BENCH_BASELINE_PATH", "db_benchmark_baseline.json")
+    BENCH_REGRESSION_TOLERANCE = float(os.getenv("BENCH_REGRESSION_TOLERANCE", "0.25"))
+    
+    # Cold-start budget enforced by import_benchmark.py
+    IMPORT_TIME_BUDGET_MS = float(os.getenv("IMPORT_TIME_BUDGET_MS", "300"))
+    
+    # Per-rerun profiler overlay (on with DEBUG); ?profile=<token> also turns it
+    # on when it matches this secret (empty = never)
+    PROFILE_TOKEN = os.getenv("PROFILE_TOKEN", "")
+    # With DEBUG set, each rerun also writes cProfile stats into this directory
+    PROFILE_DUMP_DIR = os.getenv("PROFILE_DUMP_DIR", "")
     
     # Debug mode
     DEBUG = os.getenv("DEBUG", "False").lower() == "true"
@@ -1,19 +1,32 @@
 import requests
-from typing import Optional, Dict
+from requests.adapters import HTTPAdapter
+from typing import Optional, Dict, List
 import time
 from configurations import Config as config
+from lazy import LazyInstance
+from metrics import instrument, DAILY_API_SECONDS, DAILY_API_ERRORS
+
+def _call_failed(result) -> bool:
+    return result is None or result is False
 
 class DailyAPI:
     """Daily.co API wrapper for VoiceSnap - Production Ready"""
     
-    def __init__(self):
-        self.api_key = config.DAILY_API_KEY
-        self.base_url = config.DAILY_API_URL
+    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None):
+        self.api_key = api_key or config.DAILY_API_KEY
+        self.base_url = base_url or config.DAILY_API_URL
         self.headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
         }
+        
+        # Keep-alive connection pool shared by every thread calling the API
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=config.DAILY_POOL_SIZE)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
     
+    @instrument(DAILY_API_SECONDS, DAILY_API_ERRORS, failed=_call_failed)
     def create_room(self, room_name: Optional[str] = None, max_participants: int = 100) -> Optional[Dict]:
         """Create audio-only Daily.co room"""
         
@@ -52,7 +65,7 @@ class DailyAPI:
             payload["name"] = room_name
         
         try:
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/rooms",
                 headers=self.headers,
                 json=payload,
@@ -76,6 +89,7 @@ class DailyAPI:
             print(f"❌ Error creating room: {e}")
             return None
     
+    @instrument(DAILY_API_SECONDS, DAILY_API_ERRORS, failed=_call_failed)
     def create_meeting_token(self, room_name: str, user_name: str, is_owner: bool = False) -> Optional[str]:
         """Create meeting token for user - Simplified for compatibility"""
         
@@ -93,7 +107,7 @@ class DailyAPI:
         }
         
         try:
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/meeting-tokens",
                 headers=self.headers,
                 json=payload,
@@ -117,6 +131,7 @@ class DailyAPI:
             print(f"❌ Error creating token: {e}")
             return None
     
+    @instrument(DAILY_API_SECONDS, DAILY_API_ERRORS, failed=_call_failed)
     def get_room(self, room_name: str) -> Optional[Dict]:
         """Get room details"""
         
@@ -124,7 +139,7 @@ class DailyAPI:
             return None
         
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/rooms/{room_name}",
                 headers=self.headers,
                 timeout=10
@@ -137,6 +152,7 @@ class DailyAPI:
                 print(f"❌ Error getting room: {e}")
             return None
     
+    @instrument(DAILY_API_SECONDS, DAILY_API_ERRORS, failed=_call_failed)
     def delete_room(self, room_name: str) -> bool:
         """Delete a room"""
         
@@ -144,7 +160,7 @@ class DailyAPI:
             return False
         
         try:
-            response = requests.delete(
+            response = self.session.delete(
                 f"{self.base_url}/rooms/{room_name}",
                 headers=self.headers,
                 timeout=10
@@ -164,6 +180,7 @@ class DailyAPI:
                 print(f"❌ Error deleting room: {e}")
             return False
     
+    @instrument(DAILY_API_SECONDS, DAILY_API_ERRORS, failed=_call_failed)
     def get_domain_config(self) -> Optional[Dict]:
         """Get Daily.co domain configuration (for debugging)"""
         
@@ -171,7 +188,7 @@ class DailyAPI:
             return None
         
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/",
                 headers=self.headers,
                 timeout=5
@@ -184,6 +201,7 @@ class DailyAPI:
                 print(f"❌ Error getting domain config: {e}")
             return None
     
+    @instrument(DAILY_API_SECONDS, DAILY_API_ERRORS, failed=_call_failed)
     def test_api_key(self) -> tuple[bool, str]:
         """Test if Daily.co API key is valid"""
         
@@ -191,7 +209,7 @@ class DailyAPI:
             return False, "API key not configured"
         
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/",
                 headers=self.headers,
                 timeout=5
@@ -206,4 +224,4 @@ class DailyAPI:
             return False, f"❌ API error: {str(e)}"
 
 # Create global instance
-daily = DailyAPI()
\ No newline at end of file
+daily = LazyInstance(DailyAPI)
\ No newline at end of file
@@ -0,0 +1,108 @@
+import argparse
+import json
+import secrets
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class DailyStandInHandler(BaseHTTPRequestHandler):
+    """Minimal local imitation of the Daily.co REST endpoints DailyAPI uses"""
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate sends; with Nagle on, the client's
+    # delayed ACK adds ~40 ms to every keep-alive request
+    disable_nagle_algorithm = True
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length)) if length else {}
+
+    def _simulate_latency(self):
+        if self.server.latency_ms:
+            time.sleep(self.server.latency_ms / 1000)
+
+    def do_GET(self):
+        self._simulate_latency()
+        if self.path == "/":
+            self._send(200, {"domain_name": "standin", "config": {}})
+            return
+
+        name = self.path.rsplit("/", 1)[-1]
+        with self.server.lock:
+            room = self.server.rooms.get(name)
+        if room:
+            self._send(200, room)
+        else:
+            self._send(404, {"error": "not-found"})
+
+    def do_POST(self):
+        self._simulate_latency()
+        payload = self._body()
+
+        if self.path == "/rooms":
+            name = payload.get("name") or secrets.token_hex(8)
+            room = {
+                "name": name,
+                "url": f"http://{self.server.server_address[0]}:{self.server.server_address[1]}/{name}",
+                "config": payload.get("properties", {})
+            }
+            with self.server.lock:
+                self.server.rooms[name] = room
+            self._send(200, room)
+        elif self.path == "/meeting-tokens":
+            self._send(200, {"token": secrets.token_urlsafe(32)})
+        else:
+            self._send(404, {"error": "not-found"})
+
+    def do_DELETE(self):
+        self._simulate_latency()
+        name = self.path.rsplit("/", 1)[-1]
+        with self.server.lock:
+            room = self.server.rooms.pop(name, None)
+        if room:
+            self._send(200, {"deleted": True, "name": name})
+        else:
+            self._send(404, {"error": "not-found"})
+
+    def log_message(self, format, *args):
+        pass
+
+def start_standin(host: str = "127.0.0.1", port: int = 0, latency_ms: float = 0):
+    """Start the stand-in on a background thread
+
+    Returns (server, base_url); pass base_url to DailyAPI(base_url=...) and
+    call server.shutdown() when done.
+    """
+
+    server = ThreadingHTTPServer((host, port), DailyStandInHandler)
+    server.rooms = {}
+    server.lock = threading.Lock()
+    server.latency_ms = latency_ms
+
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    host, port = server.server_address[:2]
+    return server, f"http://{host}:{port}"
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local Daily.co API stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8700)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    args = parser.parse_args()
+
+    server, base_url = start_standin(args.host, args.port, args.latency_ms)
+    print(f"🎙️ Daily.co stand-in listening on {base_url} - set DAILY_API_URL to use it")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -1,16 +1,209 @@
 import sqlite3
+import functools
+import json
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
 from typing import Optional, List, Dict
 from datetime import datetime
+from lazy import LazyInstance
+from configurations import Config as config
+from metrics import (
+    instrument, DB_QUERY_SECONDS, DB_ERRORS, DB_SLOW_QUERIES,
+    DB_WRITE_QUEUE_DEPTH, DB_WRITE_BATCH_SIZE, DB_WRITE_WAIT_SECONDS, DB_WRITE_COMMIT_SECONDS
+)
+
+# ============================================================================
+# STATEMENT INSTRUMENTATION
+# ============================================================================
+
+# sql -> parameters of the first execution, filled while a capture is active
+_query_capture: Optional[Dict] = None
+
+def start_query_capture():
+    """Record every distinct statement executed from now on (used by query_audit.py)"""
+    global _query_capture
+    _query_capture = {}
+
+def stop_query_capture() -> Dict:
+    global _query_capture
+    captured, _query_capture = _query_capture or {}, None
+    return captured
+
+def redact(parameters) -> str:
+    """Describe parameters by type only, so slow-query logs never contain user data"""
+    if parameters is None:
+        return "(executemany)"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{k}: <{type(v).__name__}>" for k, v in parameters.items()) + "}"
+    return "(" + ", ".join(f"<{type(v).__name__}>" for v in parameters) + ")"
+
+def _record_statement(sql: str, parameters, start: float):
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    if elapsed_ms >= config.SLOW_QUERY_MS:
+        DB_SLOW_QUERIES.inc()
+        print(f"🐢 Slow query ({elapsed_ms:.1f} ms): {' '.join(sql.split())} {redact(parameters)}")
+    if _query_capture is not None and parameters is not None and sql not in _query_capture:
+        _query_capture[sql] = parameters
+
+class QueryCursor(sqlite3.Cursor):
+    """Cursor that times each statement for the slow-query log"""
+    
+    def execute(self, sql, parameters=()):
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            _record_statement(sql, parameters, start)
+    
+    def executemany(self, sql, seq_of_parameters):
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            _record_statement(sql, None, start)
+
+class QueryConnection(sqlite3.Connection):
+    """Connection whose cursors (including conn.execute shortcuts) are QueryCursors"""
+    
+    def cursor(self, factory=QueryCursor):
+        return super().cursor(factory)
+    
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+    
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+# ============================================================================
+# SINGLE WRITER
+# ============================================================================
+
+class WriteQueue:
+    """One writer thread per process that group-commits queued write operations
+    
+    SQLite allows a single writer at a time. Funnelling every write through
+    one thread and connection means script threads never fight over the
+    write lock, and whatever queued up while the last transaction ran is
+    committed together. Each operation runs in its own SAVEPOINT, so one
+    that fails is rolled back alone and its future carries the error.
+    """
+    
+    def __init__(self, connect, max_batch: int = None):
+        self._connect = connect
+        self.max_batch = max_batch or config.DB_WRITE_BATCH_MAX
+        self._queue = None
+        self._pid = None
+        self._lock = threading.Lock()
+    
+    def submit(self, op, *args, **kwargs) -> Future:
+        """Queue op(cursor, *args, **kwargs); the future resolves after its commit"""
+        future = Future()
+        pending = self._ensure_thread()
+        pending.put((op, args, kwargs, future, time.perf_counter()))
+        DB_WRITE_QUEUE_DEPTH.set(pending.qsize())
+        return future
+    
+    def _ensure_thread(self):
+        # A forked worker inherits the queue but not the thread - start its own
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._queue = queue.SimpleQueue()
+                    threading.Thread(target=self._run, args=(self._queue,), name="db-writer", daemon=True).start()
+                    self._pid = os.getpid()
+        return self._queue
+    
+    def _run(self, pending):
+        conn = self._connect()
+        conn.isolation_level = None
+        
+        while True:
+            batch = [pending.get()]
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(pending.get_nowait())
+                except queue.Empty:
+                    break
+            
+            DB_WRITE_QUEUE_DEPTH.set(pending.qsize())
+            DB_WRITE_BATCH_SIZE.observe(len(batch))
+            self._commit(conn, batch)
+    
+    def _commit(self, conn, batch):
+        cursor = conn.cursor()
+        outcomes = []
+        start = time.perf_counter()
+        
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            for op, args, kwargs, future, queued in batch:
+                DB_WRITE_WAIT_SECONDS.observe(start - queued)
+                if not future.set_running_or_notify_cancel():
+                    continue
+                
+                cursor.execute("SAVEPOINT write_op")
+                try:
+                    outcomes.append((future, op(cursor, *args, **kwargs), None))
+                except Exception as e:
+                    cursor.execute("ROLLBACK TO write_op")
+                    print(f"❌ Write {getattr(op, 'func', op).__name__} failed: {e}")
+                    outcomes.append((future, None, e))
+                cursor.execute("RELEASE write_op")
+            
+            cursor.execute("COMMIT")
+        except Exception as e:
+            # Nothing in the batch was written - fail every caller
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            print(f"❌ Write batch of {len(batch)} failed: {e}")
+            for *_, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            DB_WRITE_COMMIT_SECONDS.observe(time.perf_counter() - start)
+        
+        for future, result, error in outcomes:
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+
+def write_operation(func):
+    """Run a Database method on the writer thread instead of the caller's
+    
+    The method receives the writer's cursor after self and must not commit.
+    Callers get a Future; .result() waits for the commit and returns the
+    method's result or raises its error.
+    """
+    
+    @functools.wraps(func)
+    def submit(self, *args, **kwargs) -> Future:
+        return self.writer.submit(functools.partial(func, self), *args, **kwargs)
+    
+    return submit
+
+def normalize_email(email: str) -> str:
+    """Canonical form stored for new users; lookups still compare with NOCASE"""
+    return email.strip().lower()
 
 class Database:
-    """SQLite3 database"""
+    """SQLite3 database
     
-    def __init__(self, db_path: str = "voicesnap.db"):
-        self.db_path = db_path
+    Reads open their own short-lived connection; every write goes through
+    the WriteQueue and returns a Future.
+    """
+    
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path or config.DATABASE_PATH
         self.init_database()
+        self.writer = WriteQueue(self.get_connection)
     
     def get_connection(self):
-        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, factory=QueryConnection)
         conn.row_factory = sqlite3.Row
         return conn
     
@@ -18,6 +211,9 @@ class Database:
         conn = self.get_connection()
         cursor = conn.cursor()
         
+        # WAL lets readers and a writer from several worker processes share the file
+        cursor.execute("PRAGMA journal_mode=WAL")
+        
         cursor.execute("""
         CREATE TABLE IF NOT EXISTS users (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -50,10 +246,20 @@ class Database:
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             name TEXT NOT NULL,
             created_by INTEGER,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            member_count INTEGER NOT NULL DEFAULT 0
         )
         """)
         
+        # Databases created before member_count existed: add and backfill it once
+        group_columns = {row['name'] for row in cursor.execute("PRAGMA table_info(groups)")}
+        if 'member_count' not in group_columns:
+            cursor.execute("ALTER TABLE groups ADD COLUMN member_count INTEGER NOT NULL DEFAULT 0")
+            cursor.execute("""
+            UPDATE groups SET member_count = 
+            (SELECT COUNT(*) FROM group_members gm WHERE gm.group_id = groups.id)
+            """)
+        
         cursor.execute("""
         CREATE TABLE IF NOT EXISTS group_members (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -65,42 +271,180 @@ class Database:
         )
         """)
         
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_users_email ON users(email)")
+        # Keep groups.member_count exact on every membership change, so reads never re-aggregate
+        cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_group_members_insert AFTER INSERT ON group_members
+        BEGIN
+            UPDATE groups SET member_count = member_count + 1 WHERE id = NEW.group_id;
+        END
+        """)
+        
+        cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_group_members_delete AFTER DELETE ON group_members
+        BEGIN
+            UPDATE groups SET member_count = member_count - 1 WHERE id = OLD.group_id;
+        END
+        """)
+        
+        # "People you may know": top mutual-friend counts for non-friend pairs, kept
+        # current by add_friend/import_contacts instead of a two-hop join per read
+        # and recomputed offline by rebuild_suggestions.py
+        suggestions_exist = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'friend_suggestions'"
+        ).fetchone()
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS friend_suggestions (
+            user_id INTEGER NOT NULL,
+            candidate_id INTEGER NOT NULL,
+            mutual_count INTEGER NOT NULL,
+            PRIMARY KEY (user_id, candidate_id)
+        ) WITHOUT ROWID
+        """)
+        if not suggestions_exist and cursor.execute("SELECT 1 FROM friendships LIMIT 1").fetchone():
+            print("ℹ️ friend_suggestions is empty - run rebuild_suggestions.py to backfill it")
+        
+        # Group call invitations, queued for members until they join, decline or the room ends
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS call_invitations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            room_name TEXT NOT NULL,
+            room_url TEXT NOT NULL,
+            group_id INTEGER,
+            inviter_id INTEGER NOT NULL,
+            invitee_id INTEGER NOT NULL,
+            status TEXT DEFAULT 'pending',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (group_id) REFERENCES groups (id),
+            FOREIGN KEY (inviter_id) REFERENCES users (id),
+            FOREIGN KEY (invitee_id) REFERENCES users (id),
+            UNIQUE(room_name, invitee_id)
+        )
+        """)
+        # Older versions stored each invitee's meeting token here - drop them
+        cursor.execute("PRAGMA table_info(call_invitations)")
+        if any(column['name'] == 'token' for column in cursor.fetchall()):
+            cursor.execute("ALTER TABLE call_invitations DROP COLUMN token")
+        
+        # Append-only call log (start/join/end per user), written in batches by call_log
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS call_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            event TEXT NOT NULL,
+            user_id INTEGER NOT NULL,
+            room_name TEXT NOT NULL,
+            peer_id INTEGER,
+            group_id INTEGER,
+            at REAL NOT NULL
+        )
+        """)
+        
+        # Rollups of closed call segments, so stats never scan call_events
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS call_usage_users (
+            user_id INTEGER PRIMARY KEY,
+            calls INTEGER NOT NULL DEFAULT 0,
+            minutes REAL NOT NULL DEFAULT 0,
+            last_call_at REAL
+        )
+        """)
+        
+        # calls = distinct calls (rooms) started that day, minutes = participant minutes
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS call_usage_days (
+            day TEXT PRIMARY KEY,
+            calls INTEGER NOT NULL DEFAULT 0,
+            minutes REAL NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+        """)
+        
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS call_usage_pairs (
+            user_a INTEGER NOT NULL,
+            user_b INTEGER NOT NULL,
+            calls INTEGER NOT NULL DEFAULT 0,
+            minutes REAL NOT NULL DEFAULT 0,
+            last_call_at REAL,
+            PRIMARY KEY (user_a, user_b)
+        ) WITHOUT ROWID
+        """)
+        
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS call_rollup_state (
+            name TEXT PRIMARY KEY,
+            last_event_id INTEGER NOT NULL
+        )
+        """)
+        
+        # Server-side sessions (session_store.SQLiteSessionStore); data is an opaque record
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS sessions (
+            session_id TEXT PRIMARY KEY,
+            data TEXT NOT NULL,
+            updated_at REAL NOT NULL
+        ) WITHOUT ROWID
+        """)
+        
+        # Emails are case-insensitive: this index backs the login upsert and every
+        # lookup by email. It replaces the plain idx_users_email from older versions.
+        cursor.execute("DROP INDEX IF EXISTS idx_users_email")
+        try:
+            cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_users_email_nocase ON users(email COLLATE NOCASE)")
+        except sqlite3.IntegrityError:
+            conn.close()
+            raise RuntimeError(
+                f"{self.db_path} has users whose emails differ only by case - "
+                "merge them before starting this version"
+            )
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_users_google_id ON users(google_id)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_friendships_user ON friendships(user_id)")
+        # Covers every friend-list lookup (friend ids of a user, accepted only) without
+        # touching the table rows. It replaces the plain idx_friendships_user.
+        cursor.execute("DROP INDEX IF EXISTS idx_friendships_user")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_friendships_user_status ON friendships(user_id, status, friend_id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_group_members_user ON group_members(user_id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_users_busy_room ON users(room_id) WHERE status = 'busy'")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_users_room ON users(room_id) WHERE room_id IS NOT NULL")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_friend_suggestions_rank ON friend_suggestions(user_id, mutual_count DESC)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_call_invitations_invitee ON call_invitations(invitee_id, status)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_call_invitations_pending ON call_invitations(created_at) WHERE status = 'pending'")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_call_events_user ON call_events(user_id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_call_events_room ON call_events(room_name, user_id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_call_usage_pairs_b ON call_usage_pairs(user_b)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_sessions_updated ON sessions(updated_at)")
         
         conn.commit()
         conn.close()
     
-    def create_user(self, email: str, name: str, google_id: str = None, avatar_url: str = None) -> Optional[Dict]:
+    @write_operation
+    @instrument(DB_QUERY_SECONDS, DB_ERRORS)
+    def create_user(self, cursor, email: str, name: str, google_id: str = None, avatar_url: str = None) -> Dict:
+        """Insert or refresh a user on login in a single upsert statement
+        
+        Concurrent logins for the same address cannot race into a duplicate
+        row: the conflict is resolved inside SQLite against the
+        case-insensitive email index.
+        """
+        cursor.execute("""
+        INSERT INTO users (email, name, avatar_url, google_id, status) 
+        VALUES (?, ?, ?, ?, 'available')
+        ON CONFLICT (email COLLATE NOCASE) DO UPDATE SET name = excluded.name, 
+        avatar_url = COALESCE(excluded.avatar_url, avatar_url), 
+        google_id = COALESCE(excluded.google_id, google_id), last_seen = CURRENT_TIMESTAMP
+        RETURNING *
+        """, (normalize_email(email), name, avatar_url, google_id))
+        return dict(cursor.fetchone())
+    
+    @instrument(DB_QUERY_SECONDS, DB_ERRORS)
+    def get_user(self, user_id: int) -> Optional[Dict]:
         conn = self.get_connection()
         cursor = conn.cursor()
         
-        try:
-            cursor.execute("SELECT * FROM users WHERE email = ?", (email,))
-            existing = cursor.fetchone()
-            
-            if existing:
-                cursor.execute("""
-                UPDATE users SET name = ?, avatar_url = COALESCE(?, avatar_url), 
-                google_id = COALESCE(?, google_id), last_seen = CURRENT_TIMESTAMP 
-                WHERE email = ?
-                """, (name, avatar_url, google_id, email))
-            else:
-                cursor.execute("""
-                INSERT INTO users (email, name, avatar_url, google_id, status) 
-                VALUES (?, ?, ?, ?, 'available')
-                """, (email, name, avatar_url, google_id))
-            
-            conn.commit()
-            cursor.execute("SELECT * FROM users WHERE email = ?", (email,))
-            user = cursor.fetchone()
-            conn.close()
-            return dict(user) if user else None
-        except:
-            conn.close()
-            return None
+        cursor.execute("SELECT * FROM users WHERE id = ?", (user_id,))
+        
+        user = cursor.fetchone()
+        conn.close()
+        return dict(user) if user else None
     
+    @instrument(DB_QUERY_SECONDS, DB_ERRORS)
     def search_users(self, query: str, exclude_user_id: int = None) -> List[Dict]:
         conn = self.get_connection()
         cursor = conn.cursor()
@@ -123,6 +467,7 @@ class Database:
         conn.close()
         return [dict(u) for u in users]
     
+    @instrument(DB_QUERY_SECONDS, DB_ERRORS)
     def is_friend(self, user_id: int, friend_id: int) -> bool:
         conn = self.get_connection()
         cursor = conn.cursor()
@@ -136,78 +481,804 @@ class Database:
         conn.close()
         return result['count'] > 0
     
-    def add_friend(self, user_id: int, friend_email: str) -> bool:
+    @instrument(DB_QUERY_SECONDS, DB_ERRORS)
+    def get_friend_ids(self, user_id: int, candidate_ids: List[int]) -> set:
+        """The subset of candidate_ids that are friends of user_id"""
         conn = self.get_connection()
         cursor = conn.cursor()
         
-        try:
-            cursor.execute("SELECT id FROM users WHERE email = ?", (friend_email,))
-            friend = cursor.fetchone()
-            
-            if not friend:
-                conn.close()
-                return False
-            
-            friend_id = friend['id']
-            
+        cursor.execute("""
+        SELECT c.value as id FROM json_each(?) c
+        WHERE EXISTS (
+            SELECT 1 FROM friendships f WHERE f.user_id = ? AND f.friend_id = c.value AND f.status = 'accepted'
+        )
+        """, (json.dumps(list(candidate_ids)), user_id))
+        
+        friend_ids = {row['id'] for row in cursor.fetchall()}
+        conn.close()
+        return friend_ids
+    
+    @instrument(DB_QUERY_SECONDS, DB_ERRORS)
+    def search_user_friends(self, user_id: int, query: str, limit: int = None) -> List[Dict]:
+        """Friends of user_id whose name or email contains query"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        query_pattern = f"%{query}%"
+        cursor.execute("""
+        SELECT u.* FROM friendships f
+        CROSS JOIN users u ON u.id = f.friend_id
+        WHERE f.user_id = ? AND f.status = 'accepted' AND (u.name LIKE ? OR u.email LIKE ?)
+        ORDER BY u.name LIMIT ?
+        """, (user_id, query_pattern, query_pattern, limit or config.FRIEND_PICKER_LIMIT))
+        
+        friends = cursor.fetchall()
+        conn.close()
+        return [dict(f) for f in friends]
+    
+    @write_operation
+    @instrument(DB_QUERY_SECONDS, DB_ERRORS)
+    def add_friend(self, cursor, user_id: int, friend_email: str) -> bool:
+        """Befriend the user with friend_email - False if there is no such user
+        
+        Raises ValueError for the user's own email.
+        """
+        cursor.execute("SELECT id FROM users WHERE email = ? COLLATE NOCASE", (normalize_email(friend_email),))
+        friend = cursor.fetchone()
+        
+        if not friend:
+            return False
+        
+        friend_id = friend['id']
+        if friend_id == user_id:
+            raise ValueError("You can't add yourself as a friend")
+        
+        cursor.execute("""
+        INSERT OR IGNORE INTO friendships (user_id, friend_id, status) 
+        VALUES (?, ?, 'accepted')
+        """, (user_id, friend_id))
+        is_new = cursor.rowcount == 1
+        
+        cursor.execute("""
+        INSERT OR IGNORE INTO friendships (user_id, friend_id, status) 
+        VALUES (?, ?, 'accepted')
+        """, (friend_id, user_id))
+        
+        if is_new:
+            self._update_friend_suggestions(cursor, user_id, [friend_id])
+        
+        return True
+    
+    @write_operation
+    @instrument(DB_QUERY_SECONDS, DB_ERRORS)
+    def import_contacts(self, cursor, user_id: int, emails: List[str]) -> Dict:
+        """Befriend every existing user in an email list in one transaction
+        
+        Emails are matched set-based through a temp table instead of one
+        SELECT per contact. Returns submitted/matched/unmatched/added counts.
+        """
+        unique_emails = {normalize_email(e) for e in emails if e and e.strip()}
+        # Exported address books usually include the owner - that's not an unmatched contact
+        cursor.execute("SELECT email FROM users WHERE id = ?", (user_id,))
+        own = cursor.fetchone()
+        if own:
+            unique_emails.discard(normalize_email(own['email']))
+        
+        cursor.execute("CREATE TEMP TABLE IF NOT EXISTS contact_import (email TEXT PRIMARY KEY)")
+        cursor.execute("DELETE FROM contact_import")
+        cursor.executemany("INSERT OR IGNORE INTO contact_import (email) VALUES (?)",
+                           ((e,) for e in unique_emails))
+        
+        # CROSS JOIN pins the loop order: walk the contacts, probe the users index
+        cursor.execute("""
+        SELECT u.id, EXISTS (
+            SELECT 1 FROM friendships f WHERE f.user_id = ? AND f.friend_id = u.id
+        ) as is_friend
+        FROM contact_import c
+        CROSS JOIN users u ON u.email = c.email COLLATE NOCASE
+        WHERE u.id != ?
+        """, (user_id, user_id))
+        matches = cursor.fetchall()
+        friend_ids = [row['id'] for row in matches if not row['is_friend']]
+        
+        cursor.executemany("""
+        INSERT OR IGNORE INTO friendships (user_id, friend_id, status) 
+        VALUES (?, ?, 'accepted')
+        """, ((user_id, friend_id) for friend_id in friend_ids))
+        
+        cursor.executemany("""
+        INSERT OR IGNORE INTO friendships (user_id, friend_id, status) 
+        VALUES (?, ?, 'accepted')
+        """, ((friend_id, user_id) for friend_id in friend_ids))
+        
+        if friend_ids:
+            self._update_friend_suggestions(cursor, user_id, friend_ids)
+        
+        cursor.execute("DELETE FROM contact_import")
+        return {
+            "submitted": len(unique_emails),
+            "matched": len(matches),
+            "unmatched": len(unique_emails) - len(matches),
+            "added": len(friend_ids),
+        }
+    
+    def _update_friend_suggestions(self, cursor, user_id: int, new_friend_ids: List[int]):
+        """Apply the mutual-friend changes from user_id befriending new_friend_ids
+        
+        Must run after the new friendships are inserted. Each new friend s is
+        now a mutual of user_id and every friend of s, and user_id is now a
+        mutual of s and every friend of user_id. Pairs that are already
+        friends are skipped, and so are hub users above SUGGESTION_MAX_FANOUT;
+        a user who crosses the cap here has their earlier credits withdrawn.
+        Until rows are trimmed to SUGGESTION_KEEP this matches a full rebuild.
+        """
+        new_ids = json.dumps(new_friend_ids)
+        
+        # user_id <-> friends of each new friend, both directions
+        for columns in ("?, f.friend_id", "f.friend_id, ?"):
+            cursor.execute(f"""
+            INSERT INTO friend_suggestions (user_id, candidate_id, mutual_count)
+            SELECT {columns}, COUNT(*) FROM json_each(?) n
+            CROSS JOIN friendships f ON f.user_id = n.value
+            WHERE f.friend_id != ?
+            AND (SELECT COUNT(*) FROM friendships d WHERE d.user_id = n.value) <= ?
+            AND NOT EXISTS (SELECT 1 FROM friendships x WHERE x.user_id = ? AND x.friend_id = f.friend_id)
+            GROUP BY f.friend_id
+            ON CONFLICT (user_id, candidate_id) DO UPDATE SET mutual_count = mutual_count + excluded.mutual_count
+            """, (user_id, new_ids, user_id, config.SUGGESTION_MAX_FANOUT, user_id))
+        
+        friend_count = cursor.execute(
+            "SELECT COUNT(*) FROM friendships WHERE user_id = ?", (user_id,)
+        ).fetchone()[0]
+        hub = friend_count > config.SUGGESTION_MAX_FANOUT
+        
+        if not hub:
+            # Each new friend -> every friend of user_id (new ones included)
             cursor.execute("""
-            INSERT OR IGNORE INTO friendships (user_id, friend_id, status) 
-            VALUES (?, ?, 'accepted')
-            """, (user_id, friend_id))
+            INSERT INTO friend_suggestions (user_id, candidate_id, mutual_count)
+            SELECT n.value, f.friend_id, 1 FROM json_each(?) n
+            CROSS JOIN friendships f ON f.user_id = ?
+            WHERE f.friend_id != n.value
+            AND NOT EXISTS (SELECT 1 FROM friendships x WHERE x.user_id = n.value AND x.friend_id = f.friend_id)
+            ON CONFLICT (user_id, candidate_id) DO UPDATE SET mutual_count = mutual_count + 1
+            """, (new_ids, user_id))
             
+            # Earlier friends of user_id -> each new friend (new <-> new was covered above)
             cursor.execute("""
-            INSERT OR IGNORE INTO friendships (user_id, friend_id, status) 
-            VALUES (?, ?, 'accepted')
-            """, (friend_id, user_id))
-            
-            conn.commit()
-            conn.close()
-            return True
-        except:
-            conn.close()
-            return False
+            INSERT INTO friend_suggestions (user_id, candidate_id, mutual_count)
+            SELECT f.friend_id, n.value, 1 FROM json_each(?) n
+            CROSS JOIN friendships f ON f.user_id = ?
+            WHERE f.friend_id NOT IN (SELECT value FROM json_each(?))
+            AND NOT EXISTS (SELECT 1 FROM friendships x WHERE x.user_id = f.friend_id AND x.friend_id = n.value)
+            ON CONFLICT (user_id, candidate_id) DO UPDATE SET mutual_count = mutual_count + 1
+            """, (new_ids, user_id, new_ids))
+        elif friend_count - len(new_friend_ids) <= config.SUGGESTION_MAX_FANOUT:
+            self._withdraw_hub_credits(cursor, user_id, new_friend_ids)
+        
+        # A new friend who just went over the cap by gaining user_id
+        cursor.execute("""
+        SELECT n.value FROM json_each(?) n
+        WHERE n.value != ?
+        AND (SELECT COUNT(*) FROM friendships d WHERE d.user_id = n.value) = ? + 1
+        """, (new_ids, user_id, config.SUGGESTION_MAX_FANOUT))
+        for (new_hub,) in cursor.fetchall():
+            self._withdraw_hub_credits(cursor, new_hub, [user_id])
+        
+        # The new friends are no longer suggestions for each other
+        cursor.execute("""
+        DELETE FROM friend_suggestions WHERE user_id = ? AND candidate_id IN (SELECT value FROM json_each(?))
+        """, (user_id, new_ids))
+        cursor.execute("""
+        DELETE FROM friend_suggestions WHERE candidate_id = ? AND user_id IN (SELECT value FROM json_each(?))
+        """, (user_id, new_ids))
+        
+        # user_id and the new friends gained the most rows - cut them back to the kept top N
+        cursor.execute("""
+        DELETE FROM friend_suggestions WHERE (user_id, candidate_id) IN (
+            SELECT user_id, candidate_id FROM (
+                SELECT user_id, candidate_id, ROW_NUMBER() OVER (
+                    PARTITION BY user_id ORDER BY mutual_count DESC, candidate_id
+                ) as rank
+                FROM friend_suggestions WHERE user_id IN (SELECT value FROM json_each(?))
+            ) WHERE rank > ?
+        )
+        """, (json.dumps([user_id] + new_friend_ids), config.SUGGESTION_KEEP))
+    
+    def _withdraw_hub_credits(self, cursor, hub_id: int, new_friend_ids: List[int]):
+        """Take back the mutual credit hub_id gave each pair of its earlier friends
+        
+        Called once, when hub_id goes over SUGGESTION_MAX_FANOUT - from then on
+        it no longer counts as a mutual friend, same as in a full rebuild.
+        """
+        new_ids = json.dumps(new_friend_ids)
+        cursor.execute("""
+        UPDATE friend_suggestions SET mutual_count = mutual_count - 1
+        WHERE (user_id, candidate_id) IN (
+            SELECT a.friend_id, b.friend_id FROM friendships a
+            CROSS JOIN friendships b ON b.user_id = a.user_id
+            WHERE a.user_id = ? AND a.friend_id != b.friend_id
+            AND a.friend_id NOT IN (SELECT value FROM json_each(?))
+            AND b.friend_id NOT IN (SELECT value FROM json_each(?))
+        )
+        """, (hub_id, new_ids, new_ids))
+        cursor.execute("""
+        DELETE FROM friend_suggestions WHERE mutual_count <= 0
+        AND user_id IN (SELECT friend_id FROM friendships WHERE user_id = ?)
+        """, (hub_id,))
+    
+    def _rebuild_friend_suggestions(self, cursor, first_user: int = 1, last_user: int = None) -> int:
+        """Recompute friend_suggestions for users first_user..last_user with one two-hop join
+        
+        Keeps the top SUGGESTION_KEEP candidates per user. Only for the
+        offline rebuild and bulk loads - normal writes keep it current.
+        Returns the number of rows written.
+        """
+        last_user = last_user or first_user + (1 << 62)
+        cursor.execute("""
+        DELETE FROM friend_suggestions WHERE user_id BETWEEN ? AND ?
+        """, (first_user, last_user))
+        # The OFFSET probe asks "does the mutual have more than SUGGESTION_MAX_FANOUT
+        # friends" while reading at most that many index entries
+        cursor.execute("""
+        INSERT INTO friend_suggestions (user_id, candidate_id, mutual_count)
+        SELECT user_id, candidate_id, mutual_count FROM (
+            SELECT a.user_id, b.friend_id as candidate_id, COUNT(*) as mutual_count,
+            ROW_NUMBER() OVER (PARTITION BY a.user_id ORDER BY COUNT(*) DESC, b.friend_id) as rank
+            FROM friendships a
+            CROSS JOIN friendships b ON b.user_id = a.friend_id
+            WHERE a.user_id BETWEEN ? AND ?
+            AND NOT EXISTS (SELECT 1 FROM friendships d WHERE d.user_id = a.friend_id LIMIT 1 OFFSET ?)
+            AND b.friend_id != a.user_id
+            AND NOT EXISTS (SELECT 1 FROM friendships x WHERE x.user_id = a.user_id AND x.friend_id = b.friend_id)
+            GROUP BY a.user_id, b.friend_id
+        ) WHERE rank <= ?
+        """, (first_user, last_user, config.SUGGESTION_MAX_FANOUT, config.SUGGESTION_KEEP))
+        return cursor.rowcount
     
-    def get_user_friends(self, user_id: int) -> List[Dict]:
+    @write_operation
+    @instrument(DB_QUERY_SECONDS, DB_ERRORS)
+    def rebuild_friend_suggestions(self, cursor, first_user: int = 1, last_user: int = None) -> int:
+        return self._rebuild_friend_suggestions(cursor, first_user, last_user)
+    
+    @instrument(DB_QUERY_SECONDS, DB_ERRORS)
+    def get_friend_suggestions(self, user_id: int, limit: int = None) -> List[Dict]:
+        """People user_id may know, ranked by mutual friend count"""
         conn = self.get_connection()
         cursor = conn.cursor()
         
         cursor.execute("""
+        SELECT u.*, s.mutual_count FROM friend_suggestions s
+        CROSS JOIN users u ON u.id = s.candidate_id
+        WHERE s.user_id = ?
+        ORDER BY s.mutual_count DESC
+        LIMIT ?
+        """, (user_id, limit or config.SUGGESTION_LIMIT))
+        
+        suggestions = cursor.fetchall()
+        conn.close()
+        return [dict(s) for s in suggestions]
+    
+    @instrument(DB_QUERY_SECONDS, DB_ERRORS)
+    def get_user_friends(self, user_id: int, limit: int = None, offset: int = 0,
+                         online_first: bool = False) -> List[Dict]:
+        """A page of friends, by name or with online friends first
+        
+        Ordering needs each friend's current status, so a page still reads
+        every friend (from idx_friendships_user_status, then users by id) -
+        keeping statuses on friendships would turn every status change of a
+        popular user into thousands of writes.
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        order_by = "u.name"
+        if online_first:
+            order_by = """CASE u.status WHEN 'available' THEN 0 WHEN 'busy' THEN 1 ELSE 2 END, u.name"""
+        
+        cursor.execute(f"""
         SELECT u.* FROM users u
         INNER JOIN friendships f ON u.id = f.friend_id
         WHERE f.user_id = ? AND f.status = 'accepted'
-        ORDER BY u.name
-        """, (user_id,))
+        ORDER BY {order_by}
+        LIMIT ? OFFSET ?
+        """, (user_id, -1 if limit is None else limit, offset))
         
         friends = cursor.fetchall()
         conn.close()
         return [{"friend": dict(f)} for f in friends]
     
-    def get_user_groups(self, user_id: int) -> List[Dict]:
+    @instrument(DB_QUERY_SECONDS, DB_ERRORS)
+    def count_user_friends(self, user_id: int) -> int:
         conn = self.get_connection()
         cursor = conn.cursor()
         
         cursor.execute("""
-        SELECT g.*, COUNT(gm.user_id) as member_count
-        FROM groups g
-        INNER JOIN group_members gm ON g.id = gm.group_id
-        WHERE g.id IN (SELECT group_id FROM group_members WHERE user_id = ?)
-        GROUP BY g.id
+        SELECT COUNT(*) as count FROM friendships 
+        WHERE user_id = ? AND status = 'accepted'
         """, (user_id,))
         
+        result = cursor.fetchone()
+        conn.close()
+        return result['count']
+    
+    @instrument(DB_QUERY_SECONDS, DB_ERRORS)
+    def get_user_groups(self, user_id: int, limit: int = None, offset: int = 0) -> List[Dict]:
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+        SELECT g.* FROM groups g
+        INNER JOIN group_members gm ON g.id = gm.group_id
+        WHERE gm.user_id = ?
+        ORDER BY g.name
+        LIMIT ? OFFSET ?
+        """, (user_id, -1 if limit is None else limit, offset))
+        
         groups = cursor.fetchall()
         conn.close()
         return [dict(g) for g in groups]
     
-    def update_user_status(self, user_id: int, status: str, room_id: str = None):
+    @instrument(DB_QUERY_SECONDS, DB_ERRORS)
+    def count_user_groups(self, user_id: int) -> int:
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute("SELECT COUNT(*) as count FROM group_members WHERE user_id = ?", (user_id,))
+        
+        result = cursor.fetchone()
+        conn.close()
+        return result['count']
+    
+    @write_operation
+    @instrument(DB_QUERY_SECONDS, DB_ERRORS)
+    def create_group(self, cursor, name: str, created_by: int, member_ids: List[int] = ()) -> Dict:
+        """Create a group with its creator and initial members in one transaction"""
+        cursor.execute("INSERT INTO groups (name, created_by) VALUES (?, ?)", (name, created_by))
+        group_id = cursor.lastrowid
+        self._insert_group_members(cursor, group_id, [created_by, *member_ids])
+        
+        cursor.execute("SELECT * FROM groups WHERE id = ?", (group_id,))
+        return dict(cursor.fetchone())
+    
+    @instrument(DB_QUERY_SECONDS, DB_ERRORS)
+    def get_group(self, group_id: int) -> Optional[Dict]:
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute("SELECT * FROM groups WHERE id = ?", (group_id,))
+        
+        group = cursor.fetchone()
+        conn.close()
+        return dict(group) if group else None
+    
+    @write_operation
+    @instrument(DB_QUERY_SECONDS, DB_ERRORS)
+    def rename_group(self, cursor, group_id: int, name: str) -> bool:
+        cursor.execute("UPDATE groups SET name = ? WHERE id = ?", (name, group_id))
+        return cursor.rowcount > 0
+    
+    @write_operation
+    @instrument(DB_QUERY_SECONDS, DB_ERRORS)
+    def delete_group(self, cursor, group_id: int) -> bool:
+        cursor.execute("DELETE FROM group_members WHERE group_id = ?", (group_id,))
+        cursor.execute("DELETE FROM groups WHERE id = ?", (group_id,))
+        return cursor.rowcount > 0
+    
+    def _insert_group_members(self, cursor, group_id: int, user_ids: List[int]) -> int:
+        """Insert existing users as members, enforcing MAX_ROOM_SIZE"""
+        cursor.executemany("""
+        INSERT OR IGNORE INTO group_members (group_id, user_id) 
+        SELECT ?, id FROM users WHERE id = ?
+        """, ((group_id, user_id) for user_id in dict.fromkeys(user_ids)))
+        added = max(cursor.rowcount, 0)
+        
+        cursor.execute("SELECT member_count FROM groups WHERE id = ?", (group_id,))
+        if cursor.fetchone()['member_count'] > config.MAX_ROOM_SIZE:
+            raise ValueError(f"Groups are limited to {config.MAX_ROOM_SIZE} members")
+        return added
+    
+    @write_operation
+    @instrument(DB_QUERY_SECONDS, DB_ERRORS)
+    def add_group_members(self, cursor, group_id: int, user_ids: List[int]) -> int:
+        """Bulk-add members in one transaction - returns how many were new"""
+        return self._insert_group_members(cursor, group_id, user_ids)
+    
+    @write_operation
+    @instrument(DB_QUERY_SECONDS, DB_ERRORS)
+    def remove_group_members(self, cursor, group_id: int, user_ids: List[int]) -> int:
+        """Bulk-remove members in one transaction - returns how many were removed"""
+        cursor.executemany("DELETE FROM group_members WHERE group_id = ? AND user_id = ?",
+                           ((group_id, user_id) for user_id in set(user_ids)))
+        return max(cursor.rowcount, 0)
+    
+    @instrument(DB_QUERY_SECONDS, DB_ERRORS)
+    def get_group_members(self, group_id: int) -> List[Dict]:
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+        SELECT u.* FROM users u
+        INNER JOIN group_members gm ON u.id = gm.user_id
+        WHERE gm.group_id = ?
+        ORDER BY u.name
+        """, (group_id,))
+        
+        members = cursor.fetchall()
+        conn.close()
+        return [dict(m) for m in members]
+    
+    @instrument(DB_QUERY_SECONDS, DB_ERRORS)
+    def count_active_calls(self) -> int:
         conn = self.get_connection()
         cursor = conn.cursor()
         
+        cursor.execute("""
+        SELECT COUNT(DISTINCT room_id) as count FROM users 
+        WHERE status = 'busy' AND room_id IS NOT NULL
+        """)
+        
+        result = cursor.fetchone()
+        conn.close()
+        return result['count']
+    
+    @instrument(DB_QUERY_SECONDS, DB_ERRORS)
+    def is_group_member(self, group_id: int, user_id: int) -> bool:
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+        SELECT COUNT(*) as count FROM group_members WHERE group_id = ? AND user_id = ?
+        """, (group_id, user_id))
+        
+        result = cursor.fetchone()
+        conn.close()
+        return result['count'] > 0
+    
+    @write_operation
+    @instrument(DB_QUERY_SECONDS, DB_ERRORS)
+    def update_user_status(self, cursor, user_id: int, status: str, room_id: str = None):
         cursor.execute("""
         UPDATE users SET status = ?, room_id = ?, last_seen = CURRENT_TIMESTAMP 
         WHERE id = ?
         """, (status, room_id, user_id))
+    
+    @write_operation
+    @instrument(DB_QUERY_SECONDS, DB_ERRORS)
+    def fan_out_call_invitations(self, cursor, room_name: str, room_url: str, group_id: int, inviter_id: int,
+                                 invitee_ids: List[int]) -> int:
+        """Queue invitations and ring every available invitee
         
-        conn.commit()
+        Both writes share one transaction; invitees who are offline or already
+        in another call keep their status and see the invitation later.
+        Returns how many invitees were rung.
+        """
+        cursor.executemany("""
+        INSERT OR IGNORE INTO call_invitations (room_name, room_url, group_id, inviter_id, invitee_id)
+        VALUES (?, ?, ?, ?, ?)
+        """, [(room_name, room_url, group_id, inviter_id, invitee_id) for invitee_id in invitee_ids])
+        
+        cursor.execute("""
+        UPDATE users SET status = 'ringing', room_id = ?, last_seen = CURRENT_TIMESTAMP
+        WHERE status = 'available'
+        AND id IN (SELECT invitee_id FROM call_invitations WHERE room_name = ?)
+        """, (room_name, room_name))
+        return cursor.rowcount
+    
+    @instrument(DB_QUERY_SECONDS, DB_ERRORS)
+    def get_pending_invitations(self, user_id: int) -> List[Dict]:
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+        SELECT ci.*, u.name as inviter_name, g.name as group_name
+        FROM call_invitations ci
+        INNER JOIN users u ON u.id = ci.inviter_id
+        LEFT JOIN groups g ON g.id = ci.group_id
+        WHERE ci.invitee_id = ? AND ci.status = 'pending'
+        AND ci.created_at >= datetime('now', ?)
+        ORDER BY ci.created_at DESC
+        """, (user_id, f"-{config.ROOM_EXPIRY_MINUTES} minutes"))
+        
+        invitations = cursor.fetchall()
+        conn.close()
+        return [dict(i) for i in invitations]
+    
+    @instrument(DB_QUERY_SECONDS, DB_ERRORS)
+    def get_invitation(self, room_name: str, user_id: int) -> Optional[Dict]:
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+        SELECT * FROM call_invitations WHERE room_name = ? AND invitee_id = ?
+        """, (room_name, user_id))
+        
+        invitation = cursor.fetchone()
+        conn.close()
+        return dict(invitation) if invitation else None
+    
+    @write_operation
+    @instrument(DB_QUERY_SECONDS, DB_ERRORS)
+    def respond_to_invitation(self, cursor, room_name: str, user_id: int, accept: bool) -> Optional[Dict]:
+        """Accept (join the room) or decline a pending invitation
+        
+        Returns the invitation, or None if it was not pending any more.
+        """
+        cursor.execute("""
+        UPDATE call_invitations SET status = ?
+        WHERE room_name = ? AND invitee_id = ? AND status = 'pending'
+        """, ('accepted' if accept else 'declined', room_name, user_id))
+        
+        if cursor.rowcount == 0:
+            return None
+        
+        if accept:
+            cursor.execute("""
+            UPDATE users SET status = 'busy', room_id = ?, last_seen = CURRENT_TIMESTAMP WHERE id = ?
+            """, (room_name, user_id))
+        else:
+            cursor.execute("""
+            UPDATE users SET status = 'available', room_id = NULL, last_seen = CURRENT_TIMESTAMP
+            WHERE id = ? AND status = 'ringing' AND room_id = ?
+            """, (user_id, room_name))
+        
+        cursor.execute("""
+        SELECT * FROM call_invitations WHERE room_name = ? AND invitee_id = ?
+        """, (room_name, user_id))
+        return dict(cursor.fetchone())
+    
+    @write_operation
+    @instrument(DB_QUERY_SECONDS, DB_ERRORS)
+    def release_room(self, cursor, room_name: str) -> List[int]:
+        """Free everyone still in or ringing for a room and expire its pending invitations
+        
+        Returns the ids of users who were in the call (not just ringing).
+        """
+        cursor.execute("""
+        SELECT id FROM users WHERE room_id = ? AND status = 'busy'
+        """, (room_name,))
+        released = [row['id'] for row in cursor.fetchall()]
+        
+        cursor.execute("""
+        UPDATE users SET status = 'available', room_id = NULL, last_seen = CURRENT_TIMESTAMP
+        WHERE room_id = ? AND status IN ('busy', 'ringing')
+        """, (room_name,))
+        
+        cursor.execute("""
+        UPDATE call_invitations SET status = 'expired' WHERE room_name = ? AND status = 'pending'
+        """, (room_name,))
+        return released
+    
+    @write_operation
+    @instrument(DB_QUERY_SECONDS, DB_ERRORS)
+    def expire_invitations(self, cursor) -> Dict:
+        """Expire invitations older than ROOM_EXPIRY_MINUTES and stop ringing their invitees
+        
+        Catches calls whose caller left without ending them, so release_room
+        never ran. Returns how many invitations and users were reset.
+        """
+        cursor.execute("""
+        UPDATE call_invitations SET status = 'expired'
+        WHERE status = 'pending' AND created_at < datetime('now', ?)
+        RETURNING room_name, invitee_id
+        """, (f"-{config.ROOM_EXPIRY_MINUTES} minutes",))
+        expired = cursor.fetchall()
+        
+        cursor.executemany("""
+        UPDATE users SET status = 'available', room_id = NULL, last_seen = CURRENT_TIMESTAMP
+        WHERE id = ? AND status = 'ringing' AND room_id = ?
+        """, [(row['invitee_id'], row['room_name']) for row in expired])
+        return {"invitations": len(expired), "users": cursor.rowcount if expired else 0}
+    
+    # ------------------------------------------------------------------
+    # Call history
+    # ------------------------------------------------------------------
+    
+    @write_operation
+    @instrument(DB_QUERY_SECONDS, DB_ERRORS)
+    def append_call_events(self, cursor, events: List[tuple]) -> int:
+        """Append (event, user_id, room_name, peer_id, group_id, at) rows in one transaction"""
+        cursor.executemany("""
+        INSERT INTO call_events (event, user_id, room_name, peer_id, group_id, at)
+        VALUES (?, ?, ?, ?, ?, ?)
+        """, events)
+        return len(events)
+    
+    @instrument(DB_QUERY_SECONDS, DB_ERRORS)
+    def get_recent_calls(self, user_id: int, limit: int = None) -> List[Dict]:
+        """Calls user_id started or joined, newest first"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+        SELECT e.event, e.room_name, e.at, e.peer_id, p.name as peer_name, e.group_id, g.name as group_name
+        FROM call_events e
+        LEFT JOIN users p ON p.id = e.peer_id
+        LEFT JOIN groups g ON g.id = e.group_id
+        WHERE e.user_id = ? AND e.event IN ('start', 'join')
+        ORDER BY e.id DESC
+        LIMIT ?
+        """, (user_id, limit or config.RECENT_CALLS_LIMIT))
+        
+        calls = cursor.fetchall()
+        conn.close()
+        return [dict(c) for c in calls]
+    
+    @instrument(DB_QUERY_SECONDS, DB_ERRORS)
+    def roll_up_calls(self) -> Future:
+        """Fold call segments closed since the last run into the usage tables
+        
+        A segment runs from a user's start/join in a room to their next end.
+        Pair minutes are the overlap of two users' segments in the same room,
+        counted when the later of the two closes. A room counts as one call
+        on the day its first segment started; minutes are per participant.
+        
+        Segments are computed here on a read connection; only the resulting
+        upserts and the watermark go through the writer. Returns that write's
+        Future.
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        row = cursor.execute("SELECT last_event_id FROM call_rollup_state WHERE name = 'calls'").fetchone()
+        watermark = row['last_event_id'] if row else 0
+        high = cursor.execute("SELECT COALESCE(MAX(id), 0) FROM call_events").fetchone()[0]
+        
+        # Every closed segment, up to high, of each room with a segment closed since the watermark
+        cursor.execute("""
+        SELECT e.id, e.user_id, e.room_name, e.at as ended_at, (
+            SELECT MAX(s.at) FROM call_events s
+            WHERE s.room_name = e.room_name AND s.user_id = e.user_id
+            AND s.event IN ('start', 'join') AND s.at <= e.at
+        ) as started_at
+        FROM call_events e
+        WHERE e.room_name IN (
+            SELECT room_name FROM call_events WHERE id > ? AND id <= ? AND event = 'end'
+        )
+        AND e.event = 'end' AND e.id <= ?
+        ORDER BY e.room_name, e.id
+        """, (watermark, high, high))
+        segments = [dict(row) for row in cursor.fetchall()]
+        conn.close()
+        
+        users, days, pairs = {}, {}, {}
+        
+        def add(totals, key, calls, minutes, at=None):
+            total_calls, total, last = totals.get(key, (0, 0.0, None))
+            totals[key] = (total_calls + calls, total + minutes, max(last or 0, at or 0))
+        
+        earlier = []
+        for i, end in enumerate(segments):
+            if i == 0 or end['room_name'] != segments[i - 1]['room_name']:
+                earlier = []
+            closed = [other for other in earlier if other['started_at'] is not None]
+            is_first = not closed
+            earlier.append(end)
+            
+            if end['id'] <= watermark or end['started_at'] is None:
+                continue
+            start, stop = end['started_at'], end['ended_at']
+            add(users, end['user_id'], 1, (stop - start) / 60, stop)
+            add(days, time.strftime("%Y-%m-%d", time.gmtime(start)), int(is_first), (stop - start) / 60)
+            
+            for other in closed:
+                if other['user_id'] == end['user_id']:
+                    continue
+                overlap = min(stop, other['ended_at']) - max(start, other['started_at'])
+                if overlap > 0:
+                    pair = tuple(sorted((end['user_id'], other['user_id'])))
+                    add(pairs, pair, 1, overlap / 60, stop)
+        
+        return self.apply_call_rollup(watermark, high, users, days, pairs)
+    
+    @write_operation
+    @instrument(DB_QUERY_SECONDS, DB_ERRORS)
+    def apply_call_rollup(self, cursor, watermark: int, high: int, users: Dict, days: Dict, pairs: Dict) -> Dict:
+        """Write totals computed by roll_up_calls and advance the watermark
+        
+        Skipped if another rollup moved the watermark since these were read,
+        so no event is counted twice.
+        """
+        row = cursor.execute("SELECT last_event_id FROM call_rollup_state WHERE name = 'calls'").fetchone()
+        if (row['last_event_id'] if row else 0) != watermark:
+            return {"events": 0, "users": 0, "days": 0, "pairs": 0}
+        
+        cursor.executemany("""
+        INSERT INTO call_usage_users (user_id, calls, minutes, last_call_at) VALUES (?, ?, ?, ?)
+        ON CONFLICT (user_id) DO UPDATE SET calls = calls + excluded.calls,
+            minutes = minutes + excluded.minutes, last_call_at = MAX(last_call_at, excluded.last_call_at)
+        """, [(key, *totals) for key, totals in users.items()])
+        
+        cursor.executemany("""
+        INSERT INTO call_usage_days (day, calls, minutes) VALUES (?, ?, ?)
+        ON CONFLICT (day) DO UPDATE SET calls = calls + excluded.calls, minutes = minutes + excluded.minutes
+        """, [(key, calls, minutes) for key, (calls, minutes, _) in days.items()])
+        
+        cursor.executemany("""
+        INSERT INTO call_usage_pairs (user_a, user_b, calls, minutes, last_call_at) VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT (user_a, user_b) DO UPDATE SET calls = calls + excluded.calls,
+            minutes = minutes + excluded.minutes, last_call_at = MAX(last_call_at, excluded.last_call_at)
+        """, [(*key, *totals) for key, totals in pairs.items()])
+        
+        cursor.execute("""
+        INSERT INTO call_rollup_state (name, last_event_id) VALUES ('calls', ?)
+        ON CONFLICT (name) DO UPDATE SET last_event_id = excluded.last_event_id
+        """, (high,))
+        
+        return {"events": high - watermark, "users": len(users), "days": len(days), "pairs": len(pairs)}
+    
+    @instrument(DB_QUERY_SECONDS, DB_ERRORS)
+    def get_call_usage(self, user_id: int, top: int = 5) -> Dict:
+        """Rolled-up totals for a user plus the friends they spend most time with"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute("SELECT calls, minutes, last_call_at FROM call_usage_users WHERE user_id = ?", (user_id,))
+        totals = cursor.fetchone()
+        
+        cursor.execute("""
+        SELECT u.id, u.name, p.calls, p.minutes, p.last_call_at FROM (
+            SELECT user_b as peer_id, calls, minutes, last_call_at FROM call_usage_pairs WHERE user_a = ?
+            UNION ALL
+            SELECT user_a as peer_id, calls, minutes, last_call_at FROM call_usage_pairs WHERE user_b = ?
+        ) p
+        INNER JOIN users u ON u.id = p.peer_id
+        ORDER BY p.minutes DESC
+        LIMIT ?
+        """, (user_id, user_id, top))
+        top_peers = [dict(p) for p in cursor.fetchall()]
+        
+        conn.close()
+        usage = dict(totals) if totals else {"calls": 0, "minutes": 0.0, "last_call_at": None}
+        return {**usage, "top_peers": top_peers}
+    
+    @instrument(DB_QUERY_SECONDS, DB_ERRORS)
+    def get_daily_usage(self, days: int = 30) -> List[Dict]:
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+        SELECT day, calls, minutes FROM call_usage_days
+        WHERE day >= date('now', ?)
+        ORDER BY day
+        """, (f"-{days} days",))
+        
+        usage = cursor.fetchall()
+        conn.close()
+        return [dict(u) for u in usage]
+    
+    # ------------------------------------------------------------------
+    # Sessions
+    # ------------------------------------------------------------------
+    
+    @instrument(DB_QUERY_SECONDS, DB_ERRORS)
+    def load_session(self, session_id: str, not_before: float) -> Optional[str]:
+        """The session's record, unless it was last saved before not_before"""
+        conn = self.get_connection()
+        row = conn.execute(
+            "SELECT data FROM sessions WHERE session_id = ? AND updated_at > ?",
+            (session_id, not_before)
+        ).fetchone()
         conn.close()
+        return row['data'] if row else None
+    
+    @write_operation
+    @instrument(DB_QUERY_SECONDS, DB_ERRORS)
+    def save_session(self, cursor, session_id: str, data: str):
+        cursor.execute("""
+        INSERT INTO sessions (session_id, data, updated_at) VALUES (?, ?, ?)
+        ON CONFLICT(session_id) DO UPDATE SET data = excluded.data, updated_at = excluded.updated_at
+        """, (session_id, data, time.time()))
+    
+    @write_operation
+    @instrument(DB_QUERY_SECONDS, DB_ERRORS)
+    def delete_session(self, cursor, session_id: str):
+        cursor.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+    
+    @write_operation
+    @instrument(DB_QUERY_SECONDS, DB_ERRORS)
+    def purge_sessions(self, cursor, not_before: float) -> int:
+        """Delete sessions last saved before not_before"""
+        cursor.execute("DELETE FROM sessions WHERE updated_at <= ?", (not_before,))
+        return cursor.rowcount
 
-db = Database()
\ No newline at end of file
+db = LazyInstance(Database)
\ No newline at end of file
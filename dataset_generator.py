@@ -0,0 +1,128 @@
+import argparse
+import os
+import random
+import time
+from configurations import Config as config
+from database import Database
+import rebuild_suggestions
+
+BATCH_SIZE = 50000
+
+def _batched(rows, size=BATCH_SIZE):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def _skewed_id(rng: random.Random, users: int, skew: float) -> int:
+    """Random user id biased toward low ids, giving a power-law popularity curve"""
+    return int(users * rng.random() ** skew) + 1
+
+def generate_dataset(path: str, users: int, avg_friends: int, groups: int, seed: int = 42,
+                     skew: float = 3.0) -> dict:
+    """Bulk-load a synthetic VoiceSnap dataset into a fresh DB file
+
+    Friend counts follow a Pareto distribution and friend choice favours
+    popular (low id) users, so a few users have thousands of friends while
+    most have a handful. Group sizes are Pareto too, capped at MAX_ROOM_SIZE.
+    """
+
+    if os.path.exists(path):
+        raise FileExistsError(f"{path} already exists - generate into a fresh scratch file")
+
+    rng = random.Random(seed)
+    database = Database(path)
+    conn = database.get_connection()
+
+    # Scratch file - durability is irrelevant, insert speed is everything
+    conn.execute("PRAGMA journal_mode=OFF")
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.execute("PRAGMA cache_size=-262144")
+
+    statuses = ["available"] * 2 + ["busy"] + ["offline"] * 7
+    counts = {}
+    started = time.perf_counter()
+
+    conn.execute("BEGIN")
+    for batch in _batched(
+        (f"user{i}@example.com", f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {i}",
+         f"g{i}", rng.choice(statuses))
+        for i in range(1, users + 1)
+    ):
+        conn.executemany("INSERT INTO users (email, name, google_id, status) VALUES (?, ?, ?, ?)", batch)
+    conn.commit()
+    counts["users"] = users
+    print(f"✅ {users:,} users ({time.perf_counter() - started:.1f}s)")
+
+    # Pareto(alpha=2) has mean alpha/(alpha-1) = 2, and every pair drawn gives
+    # both users a friend, so draw avg_friends / 4 * Pareto partners per user
+    def friendships():
+        for user_id in range(1, users + 1):
+            # Random rounding keeps the mean from drifting down with int()
+            degree = min(users - 1, int(rng.paretovariate(2.0) * avg_friends / 4 + rng.random()))
+            for _ in range(degree):
+                friend_id = _skewed_id(rng, users, skew)
+                if friend_id != user_id:
+                    yield (user_id, friend_id)
+                    yield (friend_id, user_id)
+
+    conn.execute("BEGIN")
+    for batch in _batched(friendships()):
+        conn.executemany("INSERT OR IGNORE INTO friendships (user_id, friend_id) VALUES (?, ?)", batch)
+    conn.commit()
+    counts["friendships"] = conn.execute("SELECT COUNT(*) FROM friendships").fetchone()[0]
+    print(f"✅ {counts['friendships']:,} friendship rows, {counts['friendships'] / users:.1f} friends per user "
+          f"({time.perf_counter() - started:.1f}s)")
+
+    conn.execute("BEGIN")
+    conn.executemany(
+        "INSERT INTO groups (id, name, created_by) VALUES (?, ?, ?)",
+        ((g, f"Group {g}", rng.randint(1, users)) for g in range(1, groups + 1))
+    )
+
+    def members():
+        for group_id in range(1, groups + 1):
+            size = min(config.MAX_ROOM_SIZE, max(2, int(rng.paretovariate(1.5) * 3)))
+            for user_id in {_skewed_id(rng, users, skew) for _ in range(size)}:
+                yield (group_id, user_id)
+
+    for batch in _batched(members()):
+        conn.executemany("INSERT OR IGNORE INTO group_members (group_id, user_id) VALUES (?, ?)", batch)
+    conn.commit()
+    counts["groups"] = groups
+    counts["group_members"] = conn.execute("SELECT COUNT(*) FROM group_members").fetchone()[0]
+    print(f"✅ {groups:,} groups, {counts['group_members']:,} memberships ({time.perf_counter() - started:.1f}s)")
+
+    # Bulk inserts bypass add_friend, so derive suggestions in one pass
+    conn.commit()
+    rebuild_suggestions.rebuild(database)
+    counts["friend_suggestions"] = conn.execute("SELECT COUNT(*) FROM friend_suggestions").fetchone()[0]
+    print(f"✅ {counts['friend_suggestions']:,} friend suggestions ({time.perf_counter() - started:.1f}s)")
+    
+    conn.execute("ANALYZE")
+    conn.close()
+    return counts
+
+FIRST_NAMES = [
+    "Aarav", "Ana", "Chen", "David", "Emma", "Fatima", "Hiro", "Isla", "Jamal", "Kofi",
+    "Lena", "Mateo", "Mei", "Noah", "Olga", "Priya", "Ravi", "Sara", "Tomas", "Yuki",
+]
+LAST_NAMES = [
+    "Ahmed", "Brown", "Costa", "Dubois", "Garcia", "Ivanova", "Kim", "Kumar", "Li", "Mensah",
+    "Moreau", "Nguyen", "Okafor", "Patel", "Rossi", "Sato", "Schmidt", "Silva", "Smith", "Wang",
+]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic VoiceSnap dataset")
+    parser.add_argument("path", help="scratch DB file to create")
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--avg-friends", type=int, default=10, help="mean friends per user")
+    parser.add_argument("--groups", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    generate_dataset(args.path, args.users, args.avg_friends, args.groups, args.seed)
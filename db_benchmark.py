@@ -0,0 +1,128 @@
+import argparse
+import json
+import random
+import sys
+from configurations import Config as config
+from database import Database
+from perf_utils import summarize, timed
+
+def _sample_users(database: Database, count: int, rng: random.Random) -> list:
+    conn = database.get_connection()
+    max_id = conn.execute("SELECT MAX(id) FROM users").fetchone()[0] or 0
+    conn.close()
+    return [rng.randint(1, max_id) for _ in range(count)]
+
+def _context(database: Database, samples: int, seed: int) -> dict:
+    """Inputs shared by the benchmarks - random users plus the worst cases"""
+    rng = random.Random(seed)
+    conn = database.get_connection()
+    busiest = conn.execute("""
+    SELECT user_id FROM friendships GROUP BY user_id ORDER BY COUNT(*) DESC LIMIT 1
+    """).fetchone()
+    most_grouped = conn.execute("""
+    SELECT user_id FROM group_members GROUP BY user_id ORDER BY COUNT(*) DESC LIMIT 1
+    """).fetchone()
+    counts = {
+        table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        for table in ("users", "friendships", "groups", "group_members")
+    }
+    conn.close()
+
+    return {
+        "rng": rng,
+        "users": _sample_users(database, samples, rng),
+        "busiest_user": busiest[0] if busiest else 1,
+        "most_grouped_user": most_grouped[0] if most_grouped else 1,
+        "counts": counts,
+    }
+
+# name -> function(database, ctx, i) timed once per sample
+BENCHMARKS = {
+    "get_user": lambda d, c, i: d.get_user(c["users"][i]),
+    "search_users_name": lambda d, c, i: d.search_users(c["rng"].choice(["Ana", "Kumar", "Mei Li"]), c["users"][i]),
+    "search_users_email": lambda d, c, i: d.search_users(f"user{c['users'][i]}@", c["users"][i]),
+    "search_users_miss": lambda d, c, i: d.search_users("zzzqqq", c["users"][i]),
+    "is_friend": lambda d, c, i: d.is_friend(c["users"][i], c["users"][-i - 1]),
+    "get_user_friends": lambda d, c, i: d.get_user_friends(c["users"][i]),
+    "get_user_friends_busiest": lambda d, c, i: d.get_user_friends(c["busiest_user"]),
+    "get_user_friends_page_busiest": lambda d, c, i: d.get_user_friends(
+        c["busiest_user"], limit=config.LIST_PAGE_SIZE, offset=0, online_first=True
+    ),
+    "get_friend_suggestions": lambda d, c, i: d.get_friend_suggestions(c["users"][i]),
+    "get_friend_suggestions_busiest": lambda d, c, i: d.get_friend_suggestions(c["busiest_user"]),
+    "count_user_friends_busiest": lambda d, c, i: d.count_user_friends(c["busiest_user"]),
+    "get_user_groups": lambda d, c, i: d.get_user_groups(c["users"][i]),
+    "get_user_groups_most_grouped": lambda d, c, i: d.get_user_groups(c["most_grouped_user"]),
+    "is_group_member": lambda d, c, i: d.is_group_member(1, c["users"][i]),
+    "get_group_members": lambda d, c, i: d.get_group_members(c["rng"].randint(1, max(1, c["counts"]["groups"]))),
+    "update_user_status": lambda d, c, i: d.update_user_status(c["users"][i], "offline", None).result(),
+}
+
+def run_benchmarks(path: str, samples: int, seed: int, only: list = None) -> dict:
+    database = Database(path)
+    ctx = _context(database, samples, seed)
+    print(f"📊 Benchmarking {path}: " + ", ".join(f"{k}={v:,}" for k, v in ctx["counts"].items()) + "\n")
+
+    results = {}
+    for name, bench in BENCHMARKS.items():
+        if only and name not in only:
+            continue
+        # One untimed call to warm the page cache
+        bench(database, ctx, 0)
+        latencies = []
+        for i in range(samples):
+            with timed(latencies):
+                bench(database, ctx, i)
+        results[name] = summarize(latencies)
+        print(f"  {name:<32} p50 {results[name]['p50_ms']:9.3f} ms  p95 {results[name]['p95_ms']:9.3f} ms")
+
+    return {"dataset": ctx["counts"], "samples": samples, "results": results}
+
+def compare(report: dict, baseline: dict, tolerance: float) -> bool:
+    """Flag benchmarks whose p95 regressed by more than tolerance vs the baseline"""
+    print(f"\n📈 Compared with baseline (tolerance {tolerance:.0%})")
+
+    if baseline.get("dataset") != report["dataset"]:
+        print(f"⚠️ Dataset differs from baseline: {baseline.get('dataset')}")
+
+    ok = True
+    for name, summary in report["results"].items():
+        base = baseline["results"].get(name)
+        if not base:
+            print(f"  ℹ️ {name:<32} no baseline")
+            continue
+        ratio = summary["p95_ms"] / base["p95_ms"] if base["p95_ms"] else 1.0
+        regressed = ratio > 1 + tolerance
+        ok = ok and not regressed
+        status = "❌" if regressed else "✅"
+        print(f"  {status} {name:<32} {base['p95_ms']:9.3f} -> {summary['p95_ms']:9.3f} ms ({ratio:.2f}x)")
+
+    return ok
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark Database methods on a generated dataset")
+    parser.add_argument("path", help="DB file produced by dataset_generator.py")
+    parser.add_argument("--samples", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--only", nargs="*", help="benchmark names to run")
+    parser.add_argument("--baseline", default=config.BENCH_BASELINE_PATH, help="baseline JSON to compare with")
+    parser.add_argument("--save-baseline", action="store_true", help="write results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=config.BENCH_REGRESSION_TOLERANCE)
+    args = parser.parse_args()
+
+    report = run_benchmarks(args.path, args.samples, args.seed, args.only)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Baseline saved to {args.baseline}")
+        sys.exit(0)
+
+    try:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        print(f"\nℹ️ No baseline at {args.baseline} - run with --save-baseline to create one")
+        sys.exit(0)
+
+    sys.exit(0 if compare(report, baseline, args.tolerance) else 1)
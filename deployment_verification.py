@@ -1,5 +1,17 @@
-import configurations as config
-from daily_api import DailyAPI as daily
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from configurations import Config as config
+from daily_api import DailyAPI, daily
+from database import Database
+from perf_utils import summarize, timed
 
 def verify_deployment():
     """Verify configuration is ready for deployment"""
@@ -32,7 +44,6 @@ def verify_deployment():
             warnings.append("⚠️ Using localhost redirect URI - update for production")
     
     # Check google_credentials.json
-    import os
     if not os.path.exists('google_credentials.json'):
         issues.append("❌ google_credentials.json not found")
     else:
@@ -40,7 +51,6 @@ def verify_deployment():
         
         # Verify JSON is valid
         try:
-            import json
             with open('google_credentials.json', 'r') as f:
                 creds = json.load(f)
                 if 'web' in creds and 'client_id' in creds['web']:
@@ -93,5 +103,152 @@ def verify_deployment():
     
     return len(issues) == 0
 
+# ============================================================================
+# PERFORMANCE VERIFICATION
+# ============================================================================
+
+def check_db_round_trip(samples: int) -> dict:
+    """Connect + trivial query + close against the deployment database
+
+    Opens plain read-only connections: Database() would run the schema DDL
+    and migrations against production.
+    """
+    if not os.path.exists(config.DATABASE_PATH):
+        raise RuntimeError(f"Database not found: {config.DATABASE_PATH}")
+    uri = f"{Path(config.DATABASE_PATH).resolve().as_uri()}?mode=ro"
+    latencies = []
+    
+    for _ in range(samples):
+        with timed(latencies):
+            conn = sqlite3.connect(uri, uri=True)
+            conn.execute("SELECT 1").fetchone()
+            conn.close()
+    
+    return {"db_round_trip": summarize(latencies)}
+
+def check_search(samples: int, dataset_size: int) -> dict:
+    """search_users on a scratch DB holding dataset_size users"""
+    with tempfile.TemporaryDirectory() as workdir:
+        database = Database(os.path.join(workdir, "perf.db"))
+        
+        conn = database.get_connection()
+        conn.executemany(
+            "INSERT INTO users (email, name, status) VALUES (?, ?, 'available')",
+            ((f"user{i}@example.com", f"User {i}") for i in range(dataset_size))
+        )
+        conn.commit()
+        conn.close()
+        
+        latencies = []
+        for _ in range(samples):
+            query = f"user{random.randrange(dataset_size)}"
+            with timed(latencies):
+                database.search_users(query, exclude_user_id=1)
+    
+    return {"search_users": summarize(latencies)}
+
+def check_daily(samples: int, base_url: str = None) -> dict:
+    """Create room, issue a meeting token and delete the room"""
+    # The stand-in accepts any key, so --daily local needs no real one
+    api = DailyAPI(api_key="standin" if base_url else None, base_url=base_url)
+    create, token, delete = [], [], []
+    
+    for _ in range(samples):
+        with timed(create):
+            room = api.create_room(max_participants=2)
+        if not room:
+            raise RuntimeError("Daily.co create_room failed")
+        with timed(token):
+            api.create_meeting_token(room['name'], "perf-check")
+        with timed(delete):
+            api.delete_room(room['name'])
+    
+    return {
+        "daily_create_room": summarize(create),
+        "daily_meeting_token": summarize(token),
+        "daily_delete_room": summarize(delete),
+    }
+
+def verify_performance(daily_mode: str = "local", report_path: str = None) -> bool:
+    """Run latency smoke tests in parallel and gate on Config p95 thresholds"""
+    
+    print("⏱️ VoiceSnap Performance Verification\n")
+    
+    thresholds = {
+        "db_round_trip": config.PERF_P95_DB_MS,
+        "search_users": config.PERF_P95_SEARCH_MS,
+        "daily_create_room": config.PERF_P95_DAILY_MS,
+        "daily_meeting_token": config.PERF_P95_DAILY_MS,
+        "daily_delete_room": config.PERF_P95_DAILY_MS,
+    }
+    
+    standin = None
+    base_url = None
+    if daily_mode == "local":
+        from daily_standin import start_standin
+        standin, base_url = start_standin()
+    
+    checks = {
+        "db": (check_db_round_trip, config.PERF_SAMPLES),
+        "search": (check_search, config.PERF_SAMPLES, config.PERF_SEARCH_DATASET_SIZE),
+        "daily": (check_daily, config.PERF_DAILY_SAMPLES, base_url),
+    }
+    
+    results = {}
+    errors = {}
+    started = time.time()
+    try:
+        with ThreadPoolExecutor(max_workers=len(checks)) as pool:
+            futures = {name: pool.submit(func, *args) for name, (func, *args) in checks.items()}
+            for name, future in futures.items():
+                try:
+                    results.update(future.result())
+                except Exception as e:
+                    errors[name] = str(e)
+    finally:
+        if standin:
+            standin.shutdown()
+    
+    passed = not errors
+    for metric, summary in results.items():
+        summary["threshold_p95_ms"] = thresholds[metric]
+        summary["passed"] = summary["p95_ms"] <= thresholds[metric]
+        passed = passed and summary["passed"]
+        
+        status = "✅" if summary["passed"] else "❌"
+        print(f"{status} {metric:<20} p50 {summary['p50_ms']:8.2f} ms  "
+              f"p95 {summary['p95_ms']:8.2f} ms  (limit {thresholds[metric]} ms)")
+    
+    for name, error in errors.items():
+        print(f"❌ {name} check failed: {error}")
+    
+    report = {
+        "timestamp": started,
+        "daily_mode": daily_mode,
+        "search_dataset_size": config.PERF_SEARCH_DATASET_SIZE,
+        "metrics": results,
+        "errors": errors,
+        "passed": passed,
+    }
+    
+    report_path = report_path or config.PERF_REPORT_PATH
+    with open(report_path, "w") as f:
+        json.dump(report, f, indent=2)
+    
+    print(f"\n📄 Report written to {report_path}")
+    print("✅ Performance within thresholds" if passed else "❌ Performance thresholds exceeded")
+    return passed
+
 if __name__ == "__main__":
-    verify_deployment()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="VoiceSnap deployment verification")
+    parser.add_argument("--perf", action="store_true", help="run performance smoke tests")
+    parser.add_argument("--daily", choices=["local", "real"], default="local",
+                        help="Daily.co backend for perf tests (local stand-in or the real API)")
+    parser.add_argument("--report", help="path of the JSON perf report")
+    args = parser.parse_args()
+    
+    ok = verify_deployment()
+    if args.perf:
+        ok = verify_performance(args.daily, args.report) and ok
+    
+    sys.exit(0 if ok else 1)
\ No newline at end of file
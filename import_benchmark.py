@@ -0,0 +1,87 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from configurations import Config as config
+
+# Modules whose import must stay cheap - app.py is a Streamlit script and
+# can only be imported inside a running Streamlit server
+MODULES = ["configurations", "database", "daily_api", "avatar_cache", "session_store", "call_log", "service", "profiler", "api_server"]
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def measure_import(module: str):
+    """Import a module in a fresh interpreter with -X importtime
+
+    Returns (cumulative_us, slowest_children, side_effects) where side_effects
+    lists files the import left behind in an empty working directory.
+    """
+
+    with tempfile.TemporaryDirectory() as workdir:
+        python_path = os.pathsep.join(filter(None, [REPO_DIR, os.environ.get("PYTHONPATH")]))
+        env = dict(os.environ, PYTHONPATH=python_path, PYTHONDONTWRITEBYTECODE="1")
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=workdir,
+            env=env,
+            capture_output=True,
+            text=True
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"import {module} failed:\n{result.stderr.strip().splitlines()[-1]}")
+
+        side_effects = sorted(os.listdir(workdir))
+
+    cumulative = 0
+    children = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line.split(":", 1)[1].split("|")
+        children.append((int(self_us), name.strip()))
+        if name.strip() == module:
+            cumulative = int(cumulative_us)
+
+    children.sort(reverse=True)
+    return cumulative, children, side_effects
+
+def run_benchmark(modules, repeat: int, budget_ms: float, top: int) -> bool:
+    print("⏱️ VoiceSnap Import-Time Benchmark\n")
+
+    ok = True
+    for module in modules:
+        samples = []
+        slowest = []
+        side_effects = []
+        for _ in range(repeat):
+            cumulative, slowest, side_effects = measure_import(module)
+            samples.append(cumulative / 1000)
+
+        median_ms = statistics.median(samples)
+        status = "✅" if median_ms <= budget_ms else "❌"
+        print(f"{status} {module:<16} {median_ms:8.1f} ms (median of {repeat})")
+
+        if median_ms > budget_ms:
+            ok = False
+            for self_us, name in slowest[:top]:
+                print(f"     {self_us / 1000:8.1f} ms  {name}")
+
+        if side_effects:
+            ok = False
+            print(f"❌ {module} created files on import: {', '.join(side_effects)}")
+
+    print(f"\nBudget: {budget_ms:.0f} ms per module")
+    print("✅ Cold start within budget" if ok else "❌ Cold start budget exceeded")
+    return ok
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Guard VoiceSnap cold-start import time")
+    parser.add_argument("modules", nargs="*", default=MODULES)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=config.IMPORT_TIME_BUDGET_MS)
+    parser.add_argument("--top", type=int, default=5, help="slowest imports to show on failure")
+    args = parser.parse_args()
+
+    sys.exit(0 if run_benchmark(args.modules, args.repeat, args.budget_ms, args.top) else 1)
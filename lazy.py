@@ -0,0 +1,40 @@
+import threading
+
+class LazyInstance:
+    """Proxy for a module-level singleton that is only built on first use"""
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._instance = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        if self._instance is None:
+            with self._lock:
+                if self._instance is None:
+                    self._instance = self._factory()
+        return self._instance
+
+    @property
+    def created(self) -> bool:
+        return self._instance is not None
+
+    def __getattr__(self, name):
+        return getattr(self.get(), name)
+
+class memoized_setting:
+    """Class attribute computed by a function on first access, then cached"""
+
+    _UNSET = object()
+
+    def __init__(self, func):
+        self.func = func
+        self.value = self._UNSET
+        self._lock = threading.Lock()
+
+    def __get__(self, instance, owner):
+        if self.value is self._UNSET:
+            with self._lock:
+                if self.value is self._UNSET:
+                    self.value = self.func()
+        return self.value
@@ -0,0 +1,321 @@
+import argparse
+import json
+import multiprocessing
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from unittest import mock
+
+from configurations import Config as config
+from perf_utils import summarize
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+USERINFO_URL = "https://www.googleapis.com/oauth2/v2/userinfo"
+STEPS = ["login", "search", "add_friend", "call", "end_call"]
+
+# ============================================================================
+# DB LOCK CONTENTION TRACKING
+# ============================================================================
+
+class LockStats:
+    """Counts 'database is locked' errors and times write statements"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.locked_errors = 0
+        self.write_ms = []
+
+    def record_write(self, elapsed_ms: float):
+        with self.lock:
+            self.write_ms.append(elapsed_ms)
+
+    def record_locked(self):
+        with self.lock:
+            self.locked_errors += 1
+
+    def drain(self):
+        """Return (locked_errors, write_ms) collected so far and reset"""
+        with self.lock:
+            result = (self.locked_errors, self.write_ms)
+            self.locked_errors = 0
+            self.write_ms = []
+        return result
+
+def instrumented_connect(stats: LockStats, connect=sqlite3.connect):
+    """sqlite3.connect replacement whose connections report writes to stats"""
+    from database import QueryConnection, QueryCursor
+
+    def track(func, is_write):
+        start = time.perf_counter()
+        try:
+            return func()
+        except sqlite3.OperationalError as e:
+            if "locked" in str(e):
+                stats.record_locked()
+            raise
+        finally:
+            if is_write:
+                stats.record_write((time.perf_counter() - start) * 1000)
+
+    class TrackedCursor(QueryCursor):
+        def execute(self, sql, *args):
+            is_write = not sql.lstrip().upper().startswith("SELECT")
+            return track(lambda: super(TrackedCursor, self).execute(sql, *args), is_write)
+
+    class TrackedConnection(QueryConnection):
+        def cursor(self, factory=TrackedCursor):
+            return super().cursor(factory)
+
+        def commit(self):
+            return track(super().commit, True)
+
+    def tracked_connect(*args, **kwargs):
+        kwargs["factory"] = TrackedConnection
+        return connect(*args, **kwargs)
+
+    return tracked_connect
+
+# ============================================================================
+# SIMULATED SESSION
+# ============================================================================
+
+def fake_userinfo(user_index: int):
+    response = mock.Mock(status_code=200)
+    response.json.return_value = {
+        "id": f"load-{user_index}",
+        "email": f"loaduser{user_index}@loadtest.local",
+        "name": f"Load User {user_index}",
+        "picture": None,
+    }
+    return response
+
+class SimulatedSession:
+    """One browser session driving app.py through Streamlit's AppTest runner"""
+
+    def __init__(self, user_index: int, friend_index: int, timeout: float):
+        from streamlit.testing.v1 import AppTest
+
+        self.user_index = user_index
+        self.friend_index = friend_index
+        self.at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+
+    def _step(self, name, action, timings, errors):
+        start = time.perf_counter()
+        try:
+            action()
+            if self.at.exception:
+                raise RuntimeError(self.at.exception[0].message)
+        except Exception as e:
+            errors[name].append(str(e))
+            return False
+        timings[name].append((time.perf_counter() - start) * 1000)
+        return True
+
+    def login(self):
+        # The stubbed OAuth code encodes which load user this session signs in as
+        self.at.query_params["code"] = f"stub-{self.user_index}"
+        self.at.run()
+        if not self.at.session_state.user:
+            raise RuntimeError("login did not set session user")
+
+    def search(self):
+        self.at.text_input[0].input(f"loaduser{self.friend_index}@").run()
+
+    def add_friend(self):
+        key = f"add_{self.friend_id}"
+        if any(b.key == key for b in self.at.button):
+            self.at.button(key=key).click().run()
+            # Re-run the search so the friend shows up with call buttons
+            self.at.run()
+
+    def call(self):
+        # The friend can flip between available and busy between the render and
+        # the click, in which case the clicked button is gone on rerun - retry
+        for _ in range(3):
+            for key in (f"call_{self.friend_id}", f"join_{self.friend_id}"):
+                if any(b.key == key for b in self.at.button):
+                    self.at.button(key=key).click().run()
+                    break
+            else:
+                raise RuntimeError("friend is offline - no call or join button")
+            if self.at.session_state.in_call:
+                return
+        if not self.at.session_state.in_call:
+            shown = "; ".join(e.value for e in self.at.error) or "no error shown"
+            raise RuntimeError(f"call did not start ({shown})")
+
+    def end_call(self):
+        self.at.button[0].click().run()
+        if self.at.session_state.in_call:
+            raise RuntimeError("call did not end")
+
+    def run_flow(self, friend_id: int, timings, errors):
+        self.friend_id = friend_id
+        for step in STEPS:
+            if not self._step(step, getattr(self, step), timings, errors):
+                return False
+        return True
+
+# ============================================================================
+# HARNESS
+# ============================================================================
+
+def seed_users(count: int):
+    """Pre-create load users so searches and friend adds have targets"""
+    from database import db
+
+    conn = db.get_connection()
+    conn.executemany(
+        "INSERT OR IGNORE INTO users (email, name, google_id, status) VALUES (?, ?, ?, 'available')",
+        ((f"loaduser{i}@loadtest.local", f"Load User {i}", f"load-{i}") for i in range(count))
+    )
+    conn.commit()
+    ids = {
+        row['email']: row['id']
+        for row in conn.execute("SELECT id, email FROM users WHERE email LIKE 'loaduser%@loadtest.local'")
+    }
+    conn.close()
+    return [ids[f"loaduser{i}@loadtest.local"] for i in range(count)]
+
+# Per-process lock stats; sessions run in forked worker processes because
+# Streamlit's AppTest runtime is a process-wide singleton
+_stats = LockStats()
+
+def _run_job(job):
+    index, friend_index, friend_id, timeout = job
+    session = SimulatedSession(index, friend_index, timeout)
+    timings = defaultdict(list)
+    errors = defaultdict(list)
+    ok = session.run_flow(friend_id, timings, errors)
+    locked_errors, write_ms = _stats.drain()
+    return ok, dict(timings), dict(errors), locked_errors, write_ms
+
+def run_load_test(users: int, concurrency: int, iterations: int, timeout: float, db_path: str = None) -> dict:
+    from daily_standin import start_standin
+
+    workdir = tempfile.mkdtemp(prefix="voicesnap-load-")
+    config.DATABASE_PATH = db_path or os.path.join(workdir, "load.db")
+    config.SESSION_BACKEND = "memory"
+    config.AVATAR_CACHE_DIR = os.path.join(workdir, "avatars")
+    standin, config.DAILY_API_URL = start_standin()
+    os.environ.setdefault("DAILY_API_KEY", "load-test")
+    os.environ.setdefault("GOOGLE_CREDENTIALS_JSON", json.dumps(
+        {"web": {"client_id": "load-test", "client_secret": "load-test"}}
+    ))
+
+    real_get = __import__("requests").get
+    real_sleep = time.sleep
+
+    def routed_get(url, *args, **kwargs):
+        if url == USERINFO_URL:
+            index = int(kwargs["headers"]["Authorization"].rsplit("-", 1)[-1])
+            return fake_userinfo(index)
+        return real_get(url, *args, **kwargs)
+
+    def fetch_token(session, url, code=None, **kwargs):
+        return {"access_token": f"token-{code.split('-', 1)[1]}"}
+
+    # Started before forking so every worker inherits them
+    patches = [
+        mock.patch("authlib.integrations.requests_client.OAuth2Session.fetch_token", fetch_token),
+        mock.patch("requests.get", routed_get),
+        mock.patch("database.sqlite3.connect", instrumented_connect(_stats)),
+        # app.py pauses a second after login/add/end so users can read the toast
+        mock.patch("time.sleep", lambda seconds: None if seconds >= 1 else real_sleep(seconds)),
+    ]
+
+    timings = defaultdict(list)
+    errors = defaultdict(list)
+    completed = []
+    locked_errors = 0
+    write_ms = []
+
+    for patch in patches:
+        patch.start()
+    try:
+        user_ids = seed_users(users)
+        _stats.drain()
+        jobs = [
+            (index, (index + 1) % users, user_ids[(index + 1) % users], timeout)
+            for _ in range(iterations) for index in range(users)
+        ]
+
+        print(f"🚀 {len(jobs)} flows, {users} users, {concurrency} concurrent sessions")
+        started = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=concurrency, mp_context=multiprocessing.get_context("fork")) as pool:
+            for ok, job_timings, job_errors, job_locked, job_writes in pool.map(_run_job, jobs):
+                completed.append(ok)
+                for step, samples in job_timings.items():
+                    timings[step].extend(samples)
+                for step, messages in job_errors.items():
+                    errors[step].extend(messages)
+                locked_errors += job_locked
+                write_ms.extend(job_writes)
+        elapsed = time.perf_counter() - started
+    finally:
+        for patch in reversed(patches):
+            patch.stop()
+        standin.shutdown()
+
+    step_count = sum(len(samples) for samples in timings.values())
+    return {
+        "users": users,
+        "concurrency": concurrency,
+        "iterations": iterations,
+        "elapsed_s": round(elapsed, 3),
+        "flows_completed": sum(completed),
+        "flows_failed": len(completed) - sum(completed),
+        "flows_per_s": round(sum(completed) / elapsed, 3),
+        "steps_per_s": round(step_count / elapsed, 3),
+        "steps": {step: summarize(timings[step]) for step in STEPS},
+        "errors": {step: {"count": len(messages), "sample": messages[:3]} for step, messages in errors.items()},
+        "db": {
+            "locked_errors": locked_errors,
+            "write": summarize(write_ms),
+        },
+    }
+
+def print_report(report: dict):
+    print("\n" + "=" * 70)
+    print("LOAD TEST SUMMARY")
+    print("=" * 70)
+    print(f"Flows: {report['flows_completed']} ok / {report['flows_failed']} failed "
+          f"in {report['elapsed_s']} s ({report['flows_per_s']} flows/s, {report['steps_per_s']} steps/s)\n")
+
+    print(f"{'step':<12}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for step, summary in report["steps"].items():
+        print(f"{step:<12}{summary['count']:>7}{summary['p50_ms']:>10.1f}{summary['p95_ms']:>10.1f}"
+              f"{summary['p99_ms']:>10.1f}{summary['max_ms']:>10.1f}")
+
+    db_stats = report["db"]
+    print(f"\n🔒 DB writes: {db_stats['write']['count']}  p95 {db_stats['write']['p95_ms']} ms  "
+          f"max {db_stats['write']['max_ms']} ms  'database is locked' errors: {db_stats['locked_errors']}")
+
+    for step, error in report["errors"].items():
+        print(f"❌ {step}: {error['count']} errors, e.g. {error['sample'][0]}")
+    print("=" * 70 + "\n")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent-user load test for the VoiceSnap app flow")
+    parser.add_argument("--users", type=int, default=20, help="distinct simulated users")
+    parser.add_argument("--concurrency", type=int, default=10, help="sessions running at once")
+    parser.add_argument("--iterations", type=int, default=1, help="flows per user")
+    parser.add_argument("--timeout", type=float, default=30, help="per-rerun timeout in seconds")
+    parser.add_argument("--db", help="database file (default: fresh scratch file)")
+    parser.add_argument("--report", help="write the JSON report here")
+    args = parser.parse_args()
+
+    # Run from the importable module so worker jobs pickle as load_test._run_job -
+    # AppTest swaps out __main__ inside the workers
+    from load_test import run_load_test, print_report
+
+    report = run_load_test(args.users, args.concurrency, args.iterations, args.timeout, args.db)
+    print_report(report)
+
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(report, f, indent=2)
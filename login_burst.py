@@ -0,0 +1,121 @@
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import database
+from database import Database
+from perf_utils import summarize, timed
+
+# Statements the writer wraps around every batch - anything else is the login itself
+TRANSACTION_CONTROL = ("BEGIN", "COMMIT", "ROLLBACK", "SAVEPOINT", "RELEASE")
+
+def _variants(email: str, rng: random.Random) -> str:
+    """The same address as a different client might send it"""
+    mixed = "".join(c.upper() if rng.random() < 0.5 else c for c in email)
+    return rng.choice([email, email.upper(), mixed, f"  {mixed} "])
+
+def _worker(db_path: str, emails: list, logins: int, threads: int, seed: int) -> dict:
+    """One process: `threads` threads sharing a Database, `logins` create_user calls in total"""
+    rng = random.Random(seed)
+    db = Database(db_path)
+    plan = [(_variants(e, rng), rng.randrange(1000)) for e in rng.choices(emails, k=logins)]
+
+    def login(item):
+        email, n = item
+        latencies = []
+        with timed(latencies):
+            user = db.create_user(email, f"Burst {n}", avatar_url=f"https://example.com/{n}.png").result()
+        return user['email'], latencies[0]
+
+    database.start_query_capture()
+    errors = []
+    latencies = []
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        for future in [pool.submit(login, item) for item in plan]:
+            try:
+                latencies.append(future.result()[1])
+            except Exception as e:
+                errors.append(f"{type(e).__name__}: {e}")
+    statements = database.stop_query_capture()
+
+    return {
+        "latencies": latencies,
+        "errors": errors,
+        "statements": [
+            sql for sql in statements
+            if not sql.lstrip().upper().startswith(TRANSACTION_CONTROL)
+        ],
+    }
+
+def run_burst(processes: int, threads: int, logins: int, addresses: int, db_path: str = None) -> bool:
+    """Hammer create_user with concurrent logins for a few addresses in mixed case
+
+    Passes when no login failed, every address ended up as exactly one row
+    and each login executed nothing but the single upsert statement.
+    """
+    print(f"🔐 Login burst: {processes} processes x {threads} threads, "
+          f"{logins} logins each over {addresses} addresses\n")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        db_path = db_path or os.path.join(workdir, "burst.db")
+        Database(db_path)
+        emails = [f"burst{i}@example.com" for i in range(addresses)]
+
+        # Fork so every worker starts from the same imported modules, like the app's workers
+        context = multiprocessing.get_context("fork")
+        with ProcessPoolExecutor(max_workers=processes, mp_context=context) as pool:
+            results = list(pool.map(
+                _worker, [db_path] * processes, [emails] * processes,
+                [logins] * processes, [threads] * processes, range(processes)
+            ))
+
+        conn = Database(db_path).get_connection()
+        rows = conn.execute(
+            "SELECT lower(email) as email, COUNT(*) as count FROM users WHERE email LIKE 'burst%' GROUP BY lower(email)"
+        ).fetchall()
+        conn.close()
+
+    errors = [e for r in results for e in r["errors"]]
+    latencies = [ms for r in results for ms in r["latencies"]]
+    statements = {" ".join(sql.split()) for r in results for sql in r["statements"]}
+    duplicates = {row['email']: row['count'] for row in rows if row['count'] > 1}
+    stored = {row['email'] for row in rows}
+
+    summary = summarize(latencies) if latencies else None
+    if summary:
+        print(f"  create_user  p50 {summary['p50_ms']:.2f} ms  p95 {summary['p95_ms']:.2f} ms  "
+              f"({len(latencies)} logins)")
+    print(f"  statements per login: {len(statements)}")
+    for sql in statements:
+        print(f"     {sql}")
+
+    ok = True
+    if errors:
+        ok = False
+        print(f"❌ {len(errors)} logins failed, e.g. {errors[0]}")
+    if duplicates:
+        ok = False
+        print(f"❌ Duplicate rows: {duplicates}")
+    if stored != set(emails):
+        ok = False
+        print(f"❌ Stored {len(stored)} addresses, expected {len(emails)}")
+    if len(statements) != 1:
+        ok = False
+        print("❌ Expected create_user to run a single statement")
+
+    print("\n✅ Login burst passed" if ok else "\n❌ Login burst failed")
+    return ok
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent login burst against create_user")
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--logins", type=int, default=250, help="logins per process")
+    parser.add_argument("--addresses", type=int, default=20, help="distinct emails shared by all logins")
+    parser.add_argument("--db", help="run against this DB file instead of a scratch one")
+    args = parser.parse_args()
+
+    sys.exit(0 if run_burst(args.processes, args.threads, args.logins, args.addresses, args.db) else 1)
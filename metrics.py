@@ -0,0 +1,267 @@
+import bisect
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from configurations import Config as config
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _label_key(labelnames, labels):
+    return tuple(str(labels.get(name, "")) for name in labelnames)
+
+def _format_labels(labelnames, key, extra=None):
+    pairs = list(zip(labelnames, key))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    escaped = (v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+class Counter:
+    """Monotonic counter"""
+
+    type = "counter"
+
+    def __init__(self, name, help, labelnames=()):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for key, value in values.items():
+            yield self.name, _format_labels(self.labelnames, key), value
+
+class Gauge:
+    """Point-in-time value, either set directly or read from a callback at scrape time"""
+
+    type = "gauge"
+
+    def __init__(self, name, help, labelnames=(), callback=None):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self.callback = callback
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[_label_key(self.labelnames, labels)] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def samples(self):
+        if self.callback:
+            try:
+                yield self.name, "", self.callback()
+            except Exception as e:
+                if config.DEBUG:
+                    print(f"⚠️ Metric {self.name} callback failed: {e}")
+            return
+        with self._lock:
+            values = dict(self._values)
+        for key, value in values.items():
+            yield self.name, _format_labels(self.labelnames, key), value
+
+class Histogram:
+    """Cumulative-bucket histogram of durations in seconds"""
+
+    type = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # key -> [per-bucket counts..., +Inf count, sum]
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = _label_key(self.labelnames, labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._values.get(key)
+            if counts is None:
+                counts = self._values[key] = [0] * (len(self.buckets) + 2)
+            counts[index] += 1
+            counts[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self):
+        with self._lock:
+            values = {key: list(counts) for key, counts in self._values.items()}
+        for key, counts in values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                yield f"{self.name}_bucket", _format_labels(self.labelnames, key, ("le", le)), cumulative
+            yield f"{self.name}_sum", _format_labels(self.labelnames, key), counts[-1]
+            yield f"{self.name}_count", _format_labels(self.labelnames, key), cumulative
+
+class Registry:
+    """Collection of metrics rendered together in Prometheus text format"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, cls, name, *args, **kwargs):
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = cls(name, *args, **kwargs)
+            return self._metrics[name]
+
+    def counter(self, name, help, labelnames=()) -> Counter:
+        return self._register(Counter, name, help, labelnames)
+
+    def gauge(self, name, help, labelnames=(), callback=None) -> Gauge:
+        return self._register(Gauge, name, help, labelnames, callback=callback)
+
+    def histogram(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram, name, help, labelnames, buckets=buckets)
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{labels} {value}")
+        return "\n".join(lines) + "\n"
+
+registry = Registry()
+
+# ============================================================================
+# VOICESNAP METRICS
+# ============================================================================
+
+def _active_calls():
+    from database import db
+    return db.count_active_calls()
+
+DB_QUERY_SECONDS = registry.histogram(
+    "voicesnap_db_query_seconds", "Database method latency", ["method"]
+)
+DB_ERRORS = registry.counter(
+    "voicesnap_db_errors_total", "Database methods that raised", ["method"]
+)
+DB_SLOW_QUERIES = registry.counter(
+    "voicesnap_db_slow_queries_total", "Statements slower than SLOW_QUERY_MS"
+)
+DAILY_API_SECONDS = registry.histogram(
+    "voicesnap_daily_api_seconds", "Daily.co API call latency", ["method"]
+)
+DAILY_API_ERRORS = registry.counter(
+    "voicesnap_daily_api_errors_total", "Daily.co API calls that failed", ["method"]
+)
+DB_WRITE_QUEUE_DEPTH = registry.gauge(
+    "voicesnap_db_write_queue_depth", "Write operations waiting for the writer thread"
+)
+DB_WRITE_BATCH_SIZE = registry.histogram(
+    "voicesnap_db_write_batch_size", "Write operations group-committed per transaction",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256)
+)
+DB_WRITE_WAIT_SECONDS = registry.histogram(
+    "voicesnap_db_write_wait_seconds", "Time write operations spent queued before running"
+)
+DB_WRITE_COMMIT_SECONDS = registry.histogram(
+    "voicesnap_db_write_commit_seconds", "Writer transaction duration, from BEGIN to COMMIT"
+)
+RERUN_SECONDS = registry.histogram(
+    "voicesnap_rerun_seconds", "Streamlit script rerun duration", ["page"]
+)
+ACTIVE_CALLS = registry.gauge(
+    "voicesnap_active_calls", "Rooms with at least one user in them", callback=_active_calls
+)
+
+def instrument(histogram: Histogram, errors: Counter, failed=None):
+    """Decorator timing a method into histogram, labelled by method name
+
+    failed(result) -> bool lets wrappers that swallow errors (and return
+    None/False instead) still count as failures.
+    """
+
+    def decorator(func):
+        method = func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except Exception:
+                errors.inc(method=method)
+                raise
+            finally:
+                histogram.observe(time.perf_counter() - start, method=method)
+            if failed and failed(result):
+                errors.inc(method=method)
+            return result
+
+        return wrapper
+
+    return decorator
+
+# ============================================================================
+# EXPORT ENDPOINT
+# ============================================================================
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+_server = None
+_server_lock = threading.Lock()
+
+def start_metrics_server(host: str = None, port: int = None):
+    """Serve /metrics from a background thread - safe to call on every rerun"""
+    global _server
+
+    if not config.METRICS_ENABLED:
+        return None
+
+    with _server_lock:
+        if _server is None:
+            try:
+                _server = ThreadingHTTPServer((host or config.METRICS_HOST, port or config.METRICS_PORT), MetricsHandler)
+            except OSError as e:
+                # Another process on this host already exports metrics on the port
+                print(f"⚠️ Metrics endpoint not started: {e}")
+                _server = False
+                return None
+            threading.Thread(target=_server.serve_forever, daemon=True).start()
+    return _server or None
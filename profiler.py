@@ -0,0 +1,169 @@
+import cProfile
+import functools
+import os
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+# The profile of the rerun executing on this thread - Streamlit runs each
+# session's script on its own thread, so sessions never see each other's
+_local = threading.local()
+
+class RerunProfile:
+    """Timings of one Streamlit rerun, split into app phases and service calls
+
+    Every phase and call is a span on a stack. A span's self time excludes
+    the spans nested in it, so the per-category totals add up to the rerun
+    without double counting - a phase's self time is Streamlit rendering
+    plus app code.
+    """
+
+    def __init__(self, dump_dir: str = None):
+        self.started = time.perf_counter()
+        self.total_ms = None
+        self.phases = []
+        self.calls: Dict[str, Dict] = {}
+        self.categories: Dict[str, float] = {}
+        self.dump_path = None
+        self._stack = []
+        self._top_level_ms = 0.0
+        self._dump_dir = dump_dir
+        self._cprofile = None
+
+        if dump_dir:
+            self._cprofile = cProfile.Profile()
+            try:
+                self._cprofile.enable()
+            except ValueError:
+                # Another profiler already owns this interpreter
+                print("⚠️ cProfile is busy - skipping the stats dump for this rerun")
+                self._cprofile = None
+
+    @contextmanager
+    def span(self, category: str, name: str, count: bool = True):
+        frame = [0.0]
+        self._stack.append(frame)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            self._stack.pop()
+            if self._stack:
+                self._stack[-1][0] += elapsed
+            else:
+                self._top_level_ms += elapsed
+
+            self.categories[category] = self.categories.get(category, 0.0) + elapsed - frame[0]
+            stats = self.calls.setdefault(name, {"name": name, "category": category, "calls": 0,
+                                                 "total_ms": 0.0, "max_ms": 0.0})
+            stats["calls"] += count
+            stats["total_ms"] += elapsed
+            stats["max_ms"] = max(stats["max_ms"], elapsed)
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            with self.span("app", f"phase:{name}"):
+                yield
+        finally:
+            self.phases.append((name, (time.perf_counter() - start) * 1000))
+
+    def finish(self):
+        self.total_ms = (time.perf_counter() - self.started) * 1000
+        # Time outside any phase (page setup and the like) still belongs to the app
+        self.categories["app"] = self.categories.get("app", 0.0) + self.total_ms - self._top_level_ms
+
+        if self._cprofile:
+            self._cprofile.disable()
+            os.makedirs(self._dump_dir, exist_ok=True)
+            self.dump_path = os.path.join(
+                self._dump_dir, f"rerun-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{id(self):x}.prof"
+            )
+            self._cprofile.dump_stats(self.dump_path)
+
+    def report(self) -> Dict:
+        return {
+            "total_ms": round(self.total_ms or 0.0, 2),
+            "phases": [{"phase": name, "ms": round(ms, 2)} for name, ms in self.phases],
+            "categories": {k: round(v, 2) for k, v in sorted(self.categories.items(), key=lambda i: -i[1])},
+            "calls": [
+                {**stats, "total_ms": round(stats["total_ms"], 2), "max_ms": round(stats["max_ms"], 2)}
+                for stats in sorted(self.calls.values(), key=lambda s: -s["total_ms"])
+                if stats["category"] != "app"
+            ],
+            "dump_path": self.dump_path,
+        }
+
+def start_rerun(enabled: bool, dump_dir: str = None) -> Optional[RerunProfile]:
+    """Begin profiling this thread's rerun, or clear a profile a previous rerun left behind"""
+    _local.profile = RerunProfile(dump_dir) if enabled else None
+    return _local.profile
+
+def finish_rerun() -> Optional[RerunProfile]:
+    profile = getattr(_local, "profile", None)
+    _local.profile = None
+    if profile:
+        profile.finish()
+    return profile
+
+def active() -> Optional[RerunProfile]:
+    return getattr(_local, "profile", None)
+
+@contextmanager
+def phase(name: str):
+    """Time a phase of the rerun; does nothing when profiling is off"""
+    profile = active()
+    if profile is None:
+        yield
+        return
+    with profile.phase(name):
+        yield
+
+class _TimedFuture:
+    """Charges the wait on a queued write to the call that queued it"""
+
+    def __init__(self, future: Future, profile: RerunProfile, category: str, name: str):
+        self._future = future
+        self._profile = profile
+        self._category = category
+        self._name = name
+
+    def result(self, timeout=None):
+        with self._profile.span(self._category, self._name, count=False):
+            return self._future.result(timeout)
+
+    def __getattr__(self, name):
+        return getattr(self._future, name)
+
+class Profiled:
+    """Proxy that times every method call on target while a rerun is being profiled
+
+    With profiling off, attribute access returns the target's own attributes
+    unwrapped.
+    """
+
+    def __init__(self, target, category: str):
+        self._target = target
+        self._category = category
+
+    def __getattr__(self, name):
+        attr = getattr(self._target, name)
+        profile = active()
+        if profile is None or not callable(attr):
+            return attr
+
+        label = f"{self._category}.{name}"
+
+        @functools.wraps(attr)
+        def call(*args, **kwargs):
+            with profile.span(self._category, label):
+                result = attr(*args, **kwargs)
+            if isinstance(result, Future):
+                return _TimedFuture(result, profile, self._category, label)
+            return result
+
+        return call
@@ -0,0 +1,173 @@
+import argparse
+import os
+import re
+import sys
+import tempfile
+import database
+from configurations import Config as config
+from database import Database
+
+# Tables that grow with the user base - a full scan of any of them is a finding
+LARGE_TABLES = {
+    "users", "friendships", "groups", "group_members", "sessions", "friend_suggestions",
+    "call_invitations", "call_events", "call_usage_users", "call_usage_pairs",
+}
+
+# Known full scans that are accepted, as (pattern on the whitespace-normalized
+# statement, table, reason). Only scans not listed here fail the audit.
+ACCEPTED_SCANS = [
+    (r"^SELECT \* FROM users WHERE \(?name LIKE \? OR email LIKE \?", "users",
+     "search_users matches substrings (LIKE '%q%'), which no B-tree index can serve; "
+     "capped at 20 rows"),
+]
+
+TABLE_REF = re.compile(r"\b(?:FROM|JOIN|UPDATE|INTO)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?", re.IGNORECASE)
+SQL_KEYWORDS = {"where", "on", "inner", "left", "cross", "join", "group", "order", "limit", "set", "values", "select"}
+
+def exercise_database(db: Database):
+    """Call every request-path Database method once so its statements get captured"""
+    db.create_user("audit1@example.com", "Audit One", google_id="audit-1").result()
+    user = db.create_user("audit2@example.com", "Audit Two", google_id="audit-2").result()
+    db.get_user(user['id'])
+    db.search_users("Audit", exclude_user_id=user['id'])
+    db.search_users("Audit")
+    db.add_friend(user['id'], "audit1@example.com").result()
+    db.import_contacts(user['id'], ["audit1@example.com", "missing@example.com"]).result()
+    # rebuild_friend_suggestions is left out - it is an offline recompute (rebuild_suggestions.py)
+    db.get_friend_suggestions(user['id'])
+    db.is_friend(user['id'], 1)
+    db.get_friend_ids(user['id'], [1, 2, 3])
+    db.search_user_friends(user['id'], "Audit")
+    db.get_user_friends(user['id'])
+    db.get_user_friends(user['id'], limit=config.LIST_PAGE_SIZE, offset=0, online_first=True)
+    db.count_user_friends(user['id'])
+    db.get_user_groups(user['id'])
+    db.get_user_groups(user['id'], limit=config.LIST_PAGE_SIZE, offset=0)
+    db.count_user_groups(user['id'])
+    group = db.create_group("Audit Group", user['id'], [1]).result()
+    db.get_group(group['id'])
+    db.add_group_members(group['id'], [1, user['id']]).result()
+    db.get_group_members(group['id'])
+    db.is_group_member(group['id'], user['id'])
+    db.remove_group_members(group['id'], [1]).result()
+    db.rename_group(group['id'], "Audit Group 2").result()
+    db.fan_out_call_invitations("audit-room", "https://audit.daily.co/audit-room", group['id'], user['id'],
+                                [1]).result()
+    db.get_pending_invitations(1)
+    db.get_invitation("audit-room", 1)
+    db.respond_to_invitation("audit-room", 1, accept=True).result()
+    db.release_room("audit-room").result()
+    db.expire_invitations().result()
+    db.append_call_events([
+        ("start", user['id'], "audit-room", 1, None, 1000.0),
+        ("join", 1, "audit-room", user['id'], None, 1010.0),
+        ("end", 1, "audit-room", None, None, 1100.0),
+        ("end", user['id'], "audit-room", None, None, 1200.0),
+    ]).result()
+    db.get_recent_calls(user['id'])
+    db.roll_up_calls().result()
+    db.get_call_usage(user['id'])
+    db.get_daily_usage()
+    db.delete_group(group['id']).result()
+    db.count_active_calls()
+    db.update_user_status(user['id'], "available", None).result()
+    db.save_session("audit-session", "{}").result()
+    db.load_session("audit-session", 0)
+    db.purge_sessions(0).result()
+    db.delete_session("audit-session").result()
+
+def table_aliases(sql: str) -> dict:
+    aliases = {}
+    for table, alias in TABLE_REF.findall(sql):
+        aliases[table.lower()] = table.lower()
+        if alias and alias.lower() not in SQL_KEYWORDS:
+            aliases[alias.lower()] = table.lower()
+    return aliases
+
+def audit_statements(db: Database, statements: dict) -> list:
+    """EXPLAIN QUERY PLAN each statement and return (sql, plan, scanned_tables) findings"""
+    findings = []
+    conn = db.get_connection()
+
+    # Temp tables only exist per connection - recreate them so statements using them can be planned
+    for sql in statements:
+        if re.match(r"\s*CREATE\s+TEMP", sql, re.IGNORECASE):
+            conn.execute(sql)
+
+    for sql, parameters in statements.items():
+        verb = sql.lstrip().split(None, 1)[0].upper()
+        if verb not in ("SELECT", "UPDATE", "DELETE", "INSERT", "WITH"):
+            continue
+
+        plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", parameters)]
+        aliases = table_aliases(sql)
+
+        scanned = set()
+        for step in plan:
+            match = re.match(r"SCAN (\w+)", step)
+            if match:
+                table = aliases.get(match.group(1).lower(), match.group(1).lower())
+                if table in LARGE_TABLES:
+                    scanned.add(table)
+
+        findings.append((sql, plan, sorted(scanned)))
+
+    conn.close()
+    return findings
+
+def accepted_reasons(sql: str, scanned: list) -> dict:
+    """table -> reason for each scan of this statement that ACCEPTED_SCANS allows"""
+    normalized = " ".join(sql.split())
+    return {
+        table: reason
+        for pattern, table, reason in ACCEPTED_SCANS
+        if table in scanned and re.search(pattern, normalized)
+    }
+
+def run_audit(db_path: str = None, verbose: bool = False) -> bool:
+    print("🔎 VoiceSnap Query Plan Audit\n")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        scratch = Database(os.path.join(workdir, "audit.db"))
+        database.start_query_capture()
+        try:
+            exercise_database(scratch)
+        finally:
+            statements = database.stop_query_capture()
+
+        # Plans depend on ANALYZE statistics, so prefer auditing against a real DB
+        target = Database(db_path) if db_path else scratch
+        findings = audit_statements(target, statements)
+
+    problems = 0
+    accepted = 0
+    for sql, plan, scanned in findings:
+        if not scanned and not verbose:
+            continue
+        reasons = accepted_reasons(sql, scanned)
+        new_scans = [table for table in scanned if table not in reasons]
+        status = "❌" if new_scans else "✅"
+        print(f"{status} {' '.join(sql.split())}")
+        for step in plan:
+            print(f"     {step}")
+        for table in scanned:
+            if table in reasons:
+                print(f"     ☑️ accepted full scan of {table}: {reasons[table]}")
+        if new_scans:
+            problems += 1
+            print(f"     ⚠️ full scan of {', '.join(new_scans)}")
+        elif scanned:
+            accepted += 1
+        print()
+
+    print(f"{len(findings)} statements audited, {problems} with new full scans of large tables "
+          f"({accepted} accepted)")
+    return problems == 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="EXPLAIN QUERY PLAN audit of every Database statement")
+    parser.add_argument("--db", help="audit plans against this DB (default: scratch DB without statistics)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="print every plan, not only findings")
+    args = parser.parse_args()
+
+    sys.exit(0 if run_audit(args.db, args.verbose) else 1)
@@ -0,0 +1,42 @@
+import argparse
+import time
+from configurations import Config as config
+from database import Database
+
+def rebuild(database: Database, chunk: int = None) -> int:
+    """Recompute friend_suggestions a chunk of users at a time
+
+    Each chunk is its own short write transaction, so the app keeps writing
+    while a large database is rebuilt.
+    """
+    chunk = chunk or config.SUGGESTION_REBUILD_CHUNK
+    conn = database.get_connection()
+    max_id = conn.execute("SELECT MAX(id) FROM users").fetchone()[0] or 0
+    conn.close()
+
+    started = time.perf_counter()
+    rows = 0
+    for first_user in range(1, max_id + 1, chunk):
+        rows += database.rebuild_friend_suggestions(first_user, first_user + chunk - 1).result()
+    print(
+        f"✅ Rebuilt friend suggestions for {max_id:,} users: {rows:,} rows "
+        f"({time.perf_counter() - started:.2f}s)"
+    )
+    return rows
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recompute the friend_suggestions table from friendships")
+    parser.add_argument("--db", default=config.DATABASE_PATH)
+    parser.add_argument("--chunk", type=int, default=config.SUGGESTION_REBUILD_CHUNK, help="users per transaction")
+    parser.add_argument("--every", type=int, nargs="?", const=config.SUGGESTION_REBUILD_SECONDS,
+                        help="keep running, rebuilding every N seconds (default SUGGESTION_REBUILD_SECONDS)")
+    args = parser.parse_args()
+
+    database = Database(args.db)
+    rebuild(database, args.chunk)
+    while args.every:
+        time.sleep(args.every)
+        try:
+            rebuild(database, args.chunk)
+        except Exception as e:
+            print(f"❌ Rebuild failed, retrying next run: {e}")
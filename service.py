@@ -0,0 +1,298 @@
+from typing import Optional, List, Dict
+from database import db as default_db
+from daily_api import daily as default_daily
+from call_log import call_log as default_call_log
+from configurations import Config as config
+from lazy import LazyInstance
+
+class ServiceError(Exception):
+    """Business-rule failure, carries the HTTP status the API should return"""
+
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+class VoiceSnapService:
+    """UI-independent VoiceSnap operations over Database and DailyAPI
+
+    The service holds no per-user state - everything lives in the database -
+    so any number of workers can serve requests against the same DB file.
+    """
+
+    def __init__(self, database=None, daily_api=None, call_log=None):
+        self.db = database or default_db
+        self.daily = daily_api or default_daily
+        self.call_log = call_log or default_call_log
+
+    def _require_user(self, user_id: int) -> Dict:
+        user = self.db.get_user(user_id)
+        if not user:
+            raise ServiceError(f"User {user_id} not found", 404)
+        return user
+
+    # ------------------------------------------------------------------
+    # Users and friends
+    # ------------------------------------------------------------------
+
+    def login(self, email: str, name: str, google_id: str = None, avatar_url: str = None) -> Dict:
+        """Create or update a user after an external (Google) login"""
+        if not email or not name:
+            raise ServiceError("email and name are required")
+
+        user = self.db.create_user(email=email, name=name, google_id=google_id, avatar_url=avatar_url).result()
+        if not user:
+            raise ServiceError("Failed to create user", 500)
+        return user
+
+    def search(self, user_id: int, query: str) -> List[Dict]:
+        if not query or len(query) < 3:
+            raise ServiceError("query must be at least 3 characters")
+        return self.db.search_users(query, exclude_user_id=user_id)
+
+    def add_friend(self, user_id: int, friend_email: str) -> Dict:
+        self._require_user(user_id)
+        if not friend_email:
+            raise ServiceError("email is required")
+        try:
+            added = self.db.add_friend(user_id, friend_email).result()
+        except ValueError as e:
+            raise ServiceError(str(e))
+        if not added:
+            raise ServiceError(f"No user with email {friend_email}", 404)
+        return {"added": friend_email}
+
+    def import_contacts(self, user_id: int, emails: List[str]) -> Dict:
+        """Add every registered user among a contact list as a friend"""
+        self._require_user(user_id)
+        if not isinstance(emails, list):
+            raise ServiceError("emails must be a list")
+        if len(emails) > config.MAX_CONTACT_IMPORT:
+            raise ServiceError(f"At most {config.MAX_CONTACT_IMPORT} contacts per import", 413)
+        return self.db.import_contacts(user_id, emails).result()
+
+    def suggest_friends(self, user_id: int, limit: int = None) -> List[Dict]:
+        """People you may know, ranked by mutual friends"""
+        self._require_user(user_id)
+        return self.db.get_friend_suggestions(user_id, limit)
+
+    def list_friends(self, user_id: int, limit: int = None, offset: int = 0) -> Dict:
+        return {
+            "total": self.db.count_user_friends(user_id),
+            "friends": [
+                f["friend"] for f in self.db.get_user_friends(user_id, limit=limit, offset=offset, online_first=True)
+            ]
+        }
+
+    def list_groups(self, user_id: int, limit: int = None, offset: int = 0) -> Dict:
+        return {
+            "total": self.db.count_user_groups(user_id),
+            "groups": self.db.get_user_groups(user_id, limit=limit, offset=offset)
+        }
+
+    # ------------------------------------------------------------------
+    # Groups
+    # ------------------------------------------------------------------
+
+    def _require_group(self, group_id: int) -> Dict:
+        group = self.db.get_group(group_id)
+        if not group:
+            raise ServiceError(f"Group {group_id} not found", 404)
+        return group
+
+    def _require_owner(self, user_id: int, group_id: int) -> Dict:
+        group = self._require_group(group_id)
+        if group['created_by'] != user_id:
+            raise ServiceError("Only the group creator can do that", 403)
+        return group
+
+    @staticmethod
+    def _member_ids(member_ids) -> List[int]:
+        if not isinstance(member_ids, (list, tuple)) or not all(isinstance(m, int) for m in member_ids):
+            raise ServiceError("member_ids must be a list of user ids")
+        return list(member_ids)
+
+    def _require_friends(self, user_id: int, member_ids: List[int]) -> List[int]:
+        """Groups only hold the creator's friends - nobody can be rung by a stranger's group"""
+        strangers = set(member_ids) - {user_id} - self.db.get_friend_ids(user_id, member_ids)
+        if strangers:
+            raise ServiceError(f"Not your friends: {', '.join(map(str, sorted(strangers)))}", 403)
+        return member_ids
+
+    def create_group(self, user_id: int, name: str, member_ids: List[int] = ()) -> Dict:
+        self._require_user(user_id)
+        name = (name or "").strip()
+        if not name:
+            raise ServiceError("Group name is required")
+        try:
+            member_ids = self._require_friends(user_id, self._member_ids(member_ids))
+            return self.db.create_group(name, user_id, member_ids).result()
+        except ValueError as e:
+            raise ServiceError(str(e), 409)
+
+    def rename_group(self, user_id: int, group_id: int, name: str) -> Dict:
+        self._require_owner(user_id, group_id)
+        name = (name or "").strip()
+        if not name:
+            raise ServiceError("Group name is required")
+        self.db.rename_group(group_id, name).result()
+        return self.db.get_group(group_id)
+
+    def delete_group(self, user_id: int, group_id: int) -> Dict:
+        self._require_owner(user_id, group_id)
+        self.db.delete_group(group_id).result()
+        return {"deleted": group_id}
+
+    def add_group_members(self, user_id: int, group_id: int, member_ids: List[int]) -> Dict:
+        self._require_owner(user_id, group_id)
+        try:
+            member_ids = self._require_friends(user_id, self._member_ids(member_ids))
+            added = self.db.add_group_members(group_id, member_ids).result()
+        except ValueError as e:
+            raise ServiceError(str(e), 409)
+        return {"added": added, "member_count": self.db.get_group(group_id)['member_count']}
+
+    def remove_group_members(self, user_id: int, group_id: int, member_ids: List[int]) -> Dict:
+        """Creator removes anyone; other members may only remove themselves (leave)"""
+        member_ids = self._member_ids(member_ids)
+        group = self._require_group(group_id)
+        if group['created_by'] != user_id and member_ids != [user_id]:
+            raise ServiceError("Only the group creator can remove other members", 403)
+        removed = self.db.remove_group_members(group_id, member_ids).result()
+        return {"removed": removed, "member_count": self.db.get_group(group_id)['member_count']}
+
+    def list_group_members(self, user_id: int, group_id: int) -> List[Dict]:
+        if not self.db.is_group_member(group_id, user_id):
+            raise ServiceError("Not a member of this group", 403)
+        return self.db.get_group_members(group_id)
+
+    # ------------------------------------------------------------------
+    # Calls
+    # ------------------------------------------------------------------
+
+    def _open_room(self, user: Dict, max_participants: int) -> Dict:
+        room = self.daily.create_room(max_participants=max_participants)
+        if not room:
+            raise ServiceError("Failed to create Daily.co room", 502)
+
+        self.db.update_user_status(user['id'], 'busy', room['name']).result()
+        return {
+            "room_name": room['name'],
+            "room_url": room['url'],
+            "token": self.daily.create_meeting_token(room['name'], user['name'], is_owner=True)
+        }
+
+    def start_call(self, user_id: int, friend_id: int) -> Dict:
+        """Start a 1:1 call with a friend"""
+        user = self._require_user(user_id)
+        if not self.db.is_friend(user_id, friend_id):
+            raise ServiceError("Can only call friends", 403)
+        call = self._open_room(user, max_participants=2)
+        self.call_log.record("start", user_id, call['room_name'], peer_id=friend_id)
+        return call
+
+    def join_call(self, user_id: int, friend_id: int) -> Dict:
+        """Join the call a friend is currently in"""
+        user = self._require_user(user_id)
+        friend = self._require_user(friend_id)
+        if not self.db.is_friend(user_id, friend_id):
+            raise ServiceError("Can only join friends' calls", 403)
+
+        room_name = friend.get('room_id')
+        if friend.get('status') != 'busy' or not room_name:
+            raise ServiceError(f"{friend['name']} is not in a call", 409)
+
+        room = self.daily.get_room(room_name)
+        room_url = room['url'] if room else f"https://{room_name}.daily.co/{room_name}"
+
+        self.db.update_user_status(user_id, 'busy', room_name).result()
+        self.call_log.record("join", user_id, room_name, peer_id=friend_id)
+        return {
+            "room_name": room_name,
+            "room_url": room_url,
+            "token": self.daily.create_meeting_token(room_name, user['name'])
+        }
+
+    def start_group_call(self, user_id: int, group_id: int) -> Dict:
+        """Start a group call and invite every other member
+
+        All invitations and statuses land in one batched write, so start
+        latency stays flat as the group grows toward MAX_ROOM_SIZE. Meeting
+        tokens are never stored - each member gets one when they accept.
+        """
+        user = self._require_user(user_id)
+        if not self.db.is_group_member(group_id, user_id):
+            raise ServiceError("Not a member of this group", 403)
+
+        members = [m for m in self.db.get_group_members(group_id) if m['id'] != user_id]
+        call = self._open_room(user, max_participants=config.MAX_ROOM_SIZE)
+        self.call_log.record("start", user_id, call['room_name'], group_id=group_id)
+
+        ringing = self.db.fan_out_call_invitations(
+            call['room_name'], call['room_url'], group_id, user_id, [m['id'] for m in members]
+        ).result()
+        return {**call, "invited": len(members), "ringing": ringing}
+
+    def list_invitations(self, user_id: int) -> List[Dict]:
+        """Pending group call invitations"""
+        self._require_user(user_id)
+        return self.db.get_pending_invitations(user_id)
+
+    def accept_invitation(self, user_id: int, room_name: str) -> Dict:
+        user = self._require_user(user_id)
+        invitation = self.db.respond_to_invitation(room_name, user_id, accept=True).result()
+        if not invitation:
+            raise ServiceError("No pending invitation for that call", 404)
+
+        self.call_log.record("join", user_id, room_name, peer_id=invitation['inviter_id'],
+                             group_id=invitation['group_id'])
+        return {
+            "room_name": room_name,
+            "room_url": invitation['room_url'],
+            "token": self.daily.create_meeting_token(room_name, user['name'])
+        }
+
+    def decline_invitation(self, user_id: int, room_name: str) -> Dict:
+        if not self.db.respond_to_invitation(room_name, user_id, accept=False).result():
+            raise ServiceError("No pending invitation for that call", 404)
+        return {"declined": room_name}
+
+    def end_call(self, user_id: int, room_name: Optional[str]) -> Dict:
+        # Invited members just leave - only the caller tears the room down
+        if room_name and self.db.get_invitation(room_name, user_id):
+            self.db.update_user_status(user_id, 'available', None).result()
+            self.call_log.record("end", user_id, room_name)
+            return {"left": room_name}
+
+        if not room_name:
+            self.db.update_user_status(user_id, 'available', None).result()
+            return {"ended": None}
+
+        # Only someone in the room may tear it down
+        if self._require_user(user_id).get('room_id') != room_name:
+            raise ServiceError("Not in that call", 403)
+
+        self.daily.delete_room(room_name)
+        # Queue both writes before waiting so they share one commit
+        released = self.db.release_room(room_name)
+        status = self.db.update_user_status(user_id, 'available', None)
+        for participant_id in set(released.result()) | {user_id}:
+            self.call_log.record("end", participant_id, room_name)
+        status.result()
+        return {"ended": room_name}
+
+    # ------------------------------------------------------------------
+    # Call history
+    # ------------------------------------------------------------------
+
+    def recent_calls(self, user_id: int, limit: int = None) -> List[Dict]:
+        self._require_user(user_id)
+        return self.db.get_recent_calls(user_id, limit)
+
+    def call_stats(self, user_id: int) -> Dict:
+        """Rolled-up usage - lags the event log by up to CALL_ROLLUP_SECONDS"""
+        self._require_user(user_id)
+        return self.db.get_call_usage(user_id)
+
+# Create global instance
+service = LazyInstance(VoiceSnapService)
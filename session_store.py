@@ -0,0 +1,108 @@
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Optional, Dict
+from configurations import Config as config
+from database import db as default_db
+from lazy import LazyInstance
+
+# Compact on-disk field names for a session record
+FIELDS = {
+    "user_id": "u",
+    "in_call": "c",
+    "current_room": "r",
+    "room_url": "l",
+    "call_owner": "o",
+}
+
+def encode_record(state: Dict) -> str:
+    """Serialize session state to a compact JSON record, dropping empty fields"""
+    record = {short: state[name] for name, short in FIELDS.items() if state.get(name)}
+    return json.dumps(record, separators=(",", ":"))
+
+def decode_record(data: str) -> Dict:
+    record = json.loads(data)
+    return {name: record.get(short) for name, short in FIELDS.items()}
+
+class SessionStore(ABC):
+    """Server-side session store interface"""
+
+    @abstractmethod
+    def load(self, session_id: str) -> Optional[Dict]:
+        ...
+
+    @abstractmethod
+    def save(self, session_id: str, state: Dict):
+        ...
+
+    @abstractmethod
+    def delete(self, session_id: str):
+        ...
+
+class MemorySessionStore(SessionStore):
+    """Process-local store - only for single-replica development"""
+
+    def __init__(self):
+        self._records: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def load(self, session_id: str) -> Optional[Dict]:
+        with self._lock:
+            data = self._records.get(session_id)
+        return decode_record(data) if data else None
+
+    def save(self, session_id: str, state: Dict):
+        with self._lock:
+            self._records[session_id] = encode_record(state)
+
+    def delete(self, session_id: str):
+        with self._lock:
+            self._records.pop(session_id, None)
+
+class SQLiteSessionStore(SessionStore):
+    """Sessions table in the app database, shared by every replica
+
+    Writes go through the database's WriteQueue like every other write, so a
+    login or logout never fights the writer thread for the SQLite lock.
+    """
+
+    def __init__(self, database=None, ttl_hours: int = None):
+        self.db = database or default_db
+        self.ttl_seconds = (ttl_hours or config.SESSION_TTL_HOURS) * 3600
+        self.purge_interval = config.SESSION_PURGE_SECONDS
+        self._last_purge = 0.0
+
+    def load(self, session_id: str) -> Optional[Dict]:
+        data = self.db.load_session(session_id, time.time() - self.ttl_seconds)
+        return decode_record(data) if data else None
+
+    def save(self, session_id: str, state: Dict):
+        saved = self.db.save_session(session_id, encode_record(state))
+
+        # Expired rows are never read again - drop them from the save path every so often;
+        # queued before waiting so both land in the same commit
+        if time.time() - self._last_purge > self.purge_interval:
+            self._last_purge = time.time()
+            self.db.purge_sessions(time.time() - self.ttl_seconds)
+        saved.result()
+
+    def delete(self, session_id: str):
+        self.db.delete_session(session_id).result()
+
+    def purge_expired(self) -> int:
+        return self.db.purge_sessions(time.time() - self.ttl_seconds).result()
+
+BACKENDS = {
+    "sqlite": SQLiteSessionStore,
+    "memory": MemorySessionStore,
+}
+
+def create_session_store(backend: str = None) -> SessionStore:
+    backend = backend or config.SESSION_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown session backend '{backend}' (expected one of {', '.join(BACKENDS)})")
+    return BACKENDS[backend]()
+
+# Create global instance
+session_store = LazyInstance(create_session_store)